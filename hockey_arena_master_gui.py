@@ -6,10 +6,10 @@
 Базирана на официалното ръководство от ha-navod.eu
 """
 
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer, NavigableString
 import json
 import time
 from datetime import datetime, timedelta
@@ -19,22 +19,111 @@ import random
 import math
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
+import contextlib
+import heapq
+import bisect
+import importlib.util
 import os
 import sys
+import subprocess
+import sqlite3
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import webbrowser
 
-# Matplotlib за графики
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import seaborn as sns
-    plt.style.use('dark_background')
-    CHARTS_AVAILABLE = True
-except ImportError:
-    CHARTS_AVAILABLE = False
+# tkinter се импортира чак при създаването на GUI (виж _load_tkinter) - конзолният режим не го зарежда
+tk = ttk = scrolledtext = messagebox = filedialog = tkfont = None
+
+def _load_tkinter():
+    """Импортира tkinter модулите в глобалните имена, ползвани от HockeyArenaGUI"""
+    global tk, ttk, scrolledtext, messagebox, filedialog, tkfont
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, messagebox, filedialog
+    from tkinter import font as tkfont
+
+# Matplotlib за графики (импортира се чак при първото рисуване)
+CHARTS_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+
+# lxml парсва HTML в C - ползва се, ако е инсталиран, иначе вграденият html.parser
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# urllib3 разкомпресира brotli само ако има brotli/brotlicffi - иначе искаме само gzip/deflate
+ACCEPT_ENCODING = ('gzip, deflate, br'
+                   if any(importlib.util.find_spec(m) is not None for m in ('brotli', 'brotlicffi'))
+                   else 'gzip, deflate')
+
+# За страниците, от които се четат само таблици - останалите елементи не се строят изобщо
+_TABLES_ONLY = SoupStrainer('table')
+
+# Регулярни изрази за парсването, компилирани веднъж
+_RE_DIGITS = re.compile(r'\d+')
+_RE_DIGITS_ONLY = re.compile(r'^\d+$')
+
+# Заглавия на колоната с отборите в класирането (не са имена на отбори)
+_SKIP_TEAM_HEADERS = frozenset({'Име на отбора', 'Team Name', 'Отбор'})
+_TEAM_INFO_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE)
+    for key, pattern in {
+        'team_name': r'Мено тіму[:\s]*([^\n]+)',
+        'league': r'Ліга[:\s]*([^\n]+)',
+        'money': r'Готовість[:\s]*([^\n]+)',
+        'players_count': r'Рочет граців[:\s]*([^\n]+)',
+        'fans': r'Фанклуб[:\s]*([^\n]+)'
+    }.items()
+}
+
+# Вид на колона в таблицата с играчи според заглавието ѝ (проверява се по ред)
+_HEADER_KINDS = (
+    (('goa', 'def', 'att', 'sho', 'spe', 'str', 'pas', 'dis'), 'attr'),
+    (('възраст', 'age'), 'age'),
+    (('форма', 'form'), 'form'),
+    (('енергия', 'energy'), 'energy'),
+)
+
+# Атрибутите за AI рейтинга и подниз(ов)ете в ключовете, от които се четат (sk/bg/en)
+_ATTR_VARIATIONS = (
+    ('goa', ('goa', 'brána')),
+    ('def', ('def', 'obrana', 'защита')),
+    ('att', ('att', 'útok', 'атака')),
+    ('sho', ('sho', 'streľba', 'стрелба')),
+    ('pas', ('pas', 'nahrávka', 'подаване')),
+    ('str', ('str', 'sila', 'сила')),
+    ('spe', ('spe', 'rýchlosť', 'скорост')),
+    ('dis', ('dis', 'sebaovládanie', 'дисциплина')),
+)
+
+# Потенциал по възраст: под 20 - 'Very High', под 23 - 'High', ... от 33 нагоре - 'Very Low'
+_POTENTIAL_CUTS = (20, 23, 27, 30, 33)
+_POTENTIAL_BUCKETS = ('Very High', 'High', 'Good', 'Medium', 'Low', 'Very Low')
+
+# Заглавия, по които се разпознава таблица с играчи
+_PLAYER_INDICATORS = frozenset(('име', 'name', 'goa', 'def', 'att', 'sho', 'spe', 'str', 'pas', 'възраст', 'age'))
+
+# Тегла за позиционните рейтинги според ръководството
+_W_GK = (0.6, 0.3, 0.1)                  # goa, spe, pas
+_W_DEF = (0.4, 0.25, 0.15, 0.1, 0.1)     # def, str, spe, pas, att
+_W_CEN = (0.3, 0.25, 0.2, 0.15, 0.1)     # pas, att, str, spe, sho
+_W_FWD = (0.3, 0.3, 0.2, 0.15, 0.05)     # att, sho, spe, pas, str
+
+def _write_text_atomic(path: str, text: str):
+    """Записва текстов файл през временен файл, за да не остане наполовина записан.
+    
+    При грешка временният файл се изтрива и изключението се пропуска нагоре.
+    """
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
 
 # Създаване на ha_assist папка
 WORK_DIR = "ha_assist"
@@ -63,17 +152,27 @@ def setup_logging():
     error_handler.setFormatter(log_formatter)
     error_handler.setLevel(logging.ERROR)
     
+    # Handler-ите работят в отделна нишка - извикващите нишки само слагат записа в опашка
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, debug_handler, error_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(debug_handler)
-    root_logger.addHandler(error_handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return root_logger
 
 logger = setup_logging()
 
+# Типове позиции, за които се изчислява рейтинг
+POSITION_TYPES = ('goalkeeper', 'defender', 'center', 'forward')
+
 @dataclass
 class PlayerStats:
     """Структура за статистики на играч според официалното ръководство"""
@@ -117,6 +216,10 @@ class PlayerStats:
             # За нападатели: Útok + Streľba главни
             return (self.att * 0.3 + self.sho * 0.3 + self.spe * 0.2 + 
                    self.pas * 0.15 + self.str_ * 0.05)
+    
+    def position_ratings(self) -> Dict[str, float]:
+        """Рейтингите за всички позиции наведнъж (в реда на POSITION_TYPES)"""
+        return {pos: self.calculate_position_rating(pos) for pos in POSITION_TYPES}
 
 @dataclass
 class TacticalSpecialization:
@@ -165,6 +268,104 @@ TACTICAL_SPECIALIZATIONS = {
     )
 }
 
+# Ключовете на специализациите (за комбо бокса в таба с тактики)
+_TACTICAL_SPEC_KEYS = tuple(TACTICAL_SPECIALIZATIONS)
+
+# (име, описание) на всяка специализация за текстовете в интерфейса
+_SPEC_CACHE = {
+    key: (spec.name, spec.description)
+    for key, spec in TACTICAL_SPECIALIZATIONS.items()
+}
+
+# Съвети за всяка формация (виж _generate_formation_tips)
+_FORMATION_TIPS = {
+    '1-4-1': (
+        "🛡️ Силна защита - използвайте за контраатаки",
+        "⏱️ Играйте търпеливо и чакайте момента",
+        "🎯 Фокусирайте се върху един нападател"
+    ),
+    '1-3-2': (
+        "⚖️ Балансирана формация за всички ситуации",
+        "🔄 Добра за ротация и адаптиране",
+        "💪 Стабилна основа за развитие"
+    ),
+    '1-2-3': (
+        "⚡ Агресивна атакуваща формация",
+        "🎯 Максимален натиск в атака",
+        "⚠️ Внимавайте с защитата при контраатаки"
+    )
+}
+
+# Специфични съвети според специализацията
+_SPEC_TIPS = {
+    'counter_attacks': (
+        "🛡️ Играйте компактно в защита",
+        "⚡ Бъдете готови за бързи контраатаки",
+        "🎯 Използвайте скоростта на нападателите"
+    ),
+    'forechecking': (
+        "💪 Агресивно натискане в чуждата зона",
+        "🏃 Високо темпо на играта",
+        "⚠️ Внимавайте с енергията на играчите"
+    ),
+    'short_passes': (
+        "🎯 Прецизни кратки подавания",
+        "🧠 Търпение при изграждане на атаките",
+        "📍 Добра позиционна игра"
+    )
+}
+
+# Всички съвети за специализация наведнъж: описанието и специфичните съвети
+_SPEC_TIP_BLOCKS = {
+    key: (f"🎯 {spec.description}", *_SPEC_TIPS.get(key, ()))
+    for key, spec in TACTICAL_SPECIALIZATIONS.items()
+}
+
+# Брой защитници и нападатели във всяка формация (виж _generate_lineup_for_formation)
+_FORMATIONS = {
+    '1-4-1': (4, 1),
+    '1-3-2': (3, 2),
+    '1-2-3': (2, 3)
+}
+
+# Начало и край на пълния отчет (виж generate_comprehensive_report)
+_REPORT_HEADER = (
+    "🏒 HOCKEY ARENA MASTER AI - ПЪЛЕН ОТЧЕТ\n" + "=" * 70 + "\n"
+    "Генериран: {generated}\n"
+    "Потребител: {user}\n\n"
+)
+_REPORT_FOOTER = (
+    "🔧 СИСТЕМНА ИНФОРМАЦИЯ\n" + "=" * 40 + "\n"
+    "• Анализирани играчи: {n_players}\n"
+    "• Анализирани противници: {n_opponents}\n"
+    "• Генерирани тактически планове: {n_plans}\n"
+    "• Версия на AI: Hockey Arena Master AI v4.0\n"
+)
+
+# Планът за ротация не зависи от данните - сглобява се веднъж
+_ROTATION_PLAN = (
+    "🔄 ПЛАН ЗА РОТАЦИЯ:\n\n"
+    
+    "⚡ ОСНОВНИ ПРИНЦИПИ:\n"
+    "• Ротирайте играчите при енергия под 70%\n"
+    "• Давайте почивка на ключовите играчи в по-леки мачове\n"
+    "• Използвайте младите играчи за натрупване на опит\n"
+    "• Следете формата - играчи в лоша форма почиват\n\n"
+    
+    "📅 СЕДМИЧЕН ГРАФИК:\n"
+    "• Понеделник: Анализ на изминалия мач\n"
+    "• Вторник-Сряда: Основни тренировки\n"
+    "• Четвъртък: Тактическа подготовка\n"
+    "• Петък: Лека тренировка + почивка\n"
+    "• Събота: Подготовка за мач\n"
+    "• Неделя: Мач или почивка\n\n"
+    
+    "⚠️ ВАЖНИ БЕЛЕЖКИ:\n"
+    "• Вратарите се уморяват според броя стрелби\n"
+    "• Младите играчи се развиват по-бързо\n"
+    "• Следете баланса между почивка и игрово време\n"
+)
+
 class GameGuideAnalyzer:
     """Анализатор на официалното ръководство"""
     
@@ -181,9 +382,17 @@ class GameGuideAnalyzer:
             'https://www.ha-navod.eu/index.php?navod=nastavenie_zostavy',
             'https://www.ha-navod.eu/index.php?navod=zohranost_formacie'
         ]
+        self._cancel_event = threading.Event()
+    
+    def cancel(self):
+        """Прекъсва текущото изтегляне на ръководството"""
+        self._cancel_event.set()
         
     def analyze_official_guide(self) -> Dict:
-        """Анализира официалното ръководство"""
+        """Анализира официалното ръководство (резултатът се кешира за сесията)"""
+        if any(self.guide_data.values()):
+            return self.guide_data
+        
         logger.info("📚 Analyzing official Hockey Arena guide...")
         
         guide_knowledge = {
@@ -199,7 +408,7 @@ class GameGuideAnalyzer:
                 try:
                     response = requests.get(url, timeout=10)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = BeautifulSoup(response.content, HTML_PARSER)
                         content = soup.get_text()
                         
                         # Извличаме ключова информация
@@ -210,7 +419,8 @@ class GameGuideAnalyzer:
                         elif 'trening' in url:
                             guide_knowledge['training'] = self._extract_training_info(content)
                         
-                        time.sleep(1)  # Уважаваме сървъра
+                        if self._cancel_event.wait(1):  # Уважаваме сървъра
+                            break
                         
                 except Exception as e:
                     logger.warning(f"Failed to fetch guide page {url}: {e}")
@@ -260,7 +470,7 @@ class BraveBrowserSimulator:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'bg-BG,bg;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -281,21 +491,37 @@ class HumanBehaviorEngine:
     def __init__(self):
         self.session_start = time.time()
         self.pages_visited = 0
+        
+        # Собствен генератор за всяка инстанция с предварително свързани методи
+        self._rng = random.Random()
+        self._random = self._rng.random
+        self._uniform = self._rng.uniform
+        
         self.last_action_time = time.time()
         self.browsing_pattern = self._generate_browsing_pattern()
+        self._cancel_event = threading.Event()
+    
+    def _wait(self, seconds: float):
+        """Изчаква зададеното време, но може да бъде прекъснато чрез cancel()"""
+        if self._cancel_event.wait(seconds):
+            raise Exception("Human behavior simulation cancelled")
+    
+    def cancel(self):
+        """Прекъсва текущите и бъдещите изчаквания (и заявките след тях)"""
+        self._cancel_event.set()
     
     def _generate_browsing_pattern(self) -> Dict:
         """Генерира уникален модел на сърфиране"""
         return {
-            'reading_speed': random.uniform(200, 350),  # думи/минута
-            'attention_span': random.uniform(30, 120),  # секунди
-            'curiosity_level': random.uniform(0.1, 0.4),  # вероятност за случайно кликване
-            'fatigue_rate': random.uniform(0.1, 0.3)  # колко бързо се уморява
+            'reading_speed': self._uniform(200, 350),  # думи/минута
+            'attention_span': self._uniform(30, 120),  # секунди
+            'curiosity_level': self._uniform(0.1, 0.4),  # вероятност за случайно кликване
+            'fatigue_rate': self._uniform(0.1, 0.3)  # колко бързо се уморява
         }
     
     def realistic_delay(self, min_seconds: float = 2.0, max_seconds: float = 8.0):
         """Реалистичен delay с човешки фактори"""
-        base_delay = random.uniform(min_seconds, max_seconds)
+        base_delay = self._uniform(min_seconds, max_seconds)
         
         # Фактор на умора
         session_time = time.time() - self.session_start
@@ -303,16 +529,17 @@ class HumanBehaviorEngine:
         base_delay *= fatigue_factor
         
         # Случайни "мисловни" паузи
-        if random.random() < 0.15:
-            base_delay += random.uniform(3.0, 12.0)
+        if self._random() < 0.15:
+            base_delay += self._uniform(3.0, 12.0)
             logger.debug("🤔 Deep thinking pause...")
         
         # Микро паузи за "четене"
-        if random.random() < 0.4:
-            base_delay += random.uniform(0.5, 2.5)
+        if self._random() < 0.4:
+            base_delay += self._uniform(0.5, 2.5)
         
-        logger.debug(f"💤 Human delay: {base_delay:.1f}s")
-        time.sleep(base_delay)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"💤 Human delay: {base_delay:.1f}s")
+        self._wait(base_delay)
         
         self.pages_visited += 1
         self.last_action_time = time.time()
@@ -326,33 +553,105 @@ class HumanBehaviorEngine:
         reading_time = max(1.0, min(reading_time, self.browsing_pattern['attention_span']))
         
         # Добавяме случайност
-        actual_time = reading_time * random.uniform(0.3, 1.8)
+        actual_time = reading_time * self._uniform(0.3, 1.8)
         
-        logger.debug(f"📖 Reading simulation: {actual_time:.1f}s")
-        time.sleep(actual_time)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"📖 Reading simulation: {actual_time:.1f}s")
+        self._wait(actual_time)
     
     def should_explore_randomly(self) -> bool:
         """Решава дали да направи случайно разглеждане"""
-        return random.random() < self.browsing_pattern['curiosity_level']
+        return self._random() < self.browsing_pattern['curiosity_level']
 
 class OpponentIntelligence:
     """Интелигентна система за анализ на противници"""
     
+    CACHE_DB = "opponent_cache.sqlite"
+    STANDINGS_TTL = 300  # секунди
+    MAX_WORKERS = 6
+    
     def __init__(self, session, base_url: str):
         self.session = session
         self.base_url = base_url
         self.opponent_cache = {}
-        
+        self._cache_lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_cache = self._open_disk_cache()
+        if self._disk_cache is not None:
+            atexit.register(self.close)
+        
+        # Класирането е една и съща страница за всички противници
+        self._standings_soup = None
+        self._standings_time = 0.0
+        self._standings_lock = threading.Lock()
+    
+    def _open_disk_cache(self) -> Optional[sqlite3.Connection]:
+        """Отваря дисковия кеш с анализи (оцелява след рестарт на програмата)"""
+        try:
+            conn = sqlite3.connect(self.CACHE_DB, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS opponents "
+                "(name TEXT PRIMARY KEY, created REAL NOT NULL, analysis TEXT NOT NULL)"
+            )
+            conn.commit()
+            return conn
+        except Exception as e:
+            logger.warning(f"Opponent disk cache unavailable: {e}")
+            return None
+    
+    def close(self):
+        """Затваря дисковия кеш - след това анализите се пазят само в паметта"""
+        with self._disk_lock:
+            if self._disk_cache is not None:
+                self._disk_cache.close()
+                self._disk_cache = None
+    
+    def _cache_cutoff(self) -> float:
+        """Начало на текущия ден - статистиките на отборите се сменят след мачовете"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today.timestamp()
+    
+    def _load_cached_analysis(self, opponent_name: str) -> Optional[Dict]:
+        """Връща анализ от дисковия кеш, ако е направен днес"""
+        try:
+            with self._disk_lock:
+                if self._disk_cache is None:
+                    return None
+                row = self._disk_cache.execute(
+                    "SELECT analysis FROM opponents WHERE name = ? AND created > ?",
+                    (opponent_name, self._cache_cutoff())
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Opponent disk cache read failed: {e}")
+            return None
+    
+    def _store_cached_analysis(self, opponent_name: str, analysis: Dict):
+        """Записва анализа в дисковия кеш"""
+        try:
+            with self._disk_lock:
+                if self._disk_cache is None:
+                    return
+                self._disk_cache.execute(
+                    "INSERT OR REPLACE INTO opponents (name, created, analysis) VALUES (?, ?, ?)",
+                    (opponent_name, time.time(),
+                     json.dumps(analysis, ensure_ascii=False, separators=(',', ':')))
+                )
+                self._disk_cache.commit()
+        except Exception as e:
+            logger.warning(f"Opponent disk cache write failed: {e}")
+    
     def analyze_opponent(self, opponent_name: str) -> Dict:
         """Анализира противник с AI предвиждания"""
         logger.info(f"🎯 Analyzing opponent: {opponent_name}")
         
-        if opponent_name in self.opponent_cache:
-            return self.opponent_cache[opponent_name]
+        cached = self.get_cached(opponent_name)
+        if cached is not None:
+            return cached
         
         try:
             # Събираме данни за противника
-            opponent_data = self._gather_opponent_data(opponent_name)
+            opponent_data, complete = self._gather_opponent_data(opponent_name)
             
             # AI анализ
             analysis = {
@@ -374,7 +673,13 @@ class OpponentIntelligence:
             analysis['recommended_tactics'] = self._generate_counter_tactics(analysis)
             analysis['match_instructions'] = self._generate_match_instructions(analysis)
             
-            self.opponent_cache[opponent_name] = analysis
+            with self._cache_lock:
+                analysis = self.opponent_cache.setdefault(opponent_name, analysis)
+            
+            # Анализ без класиране е само приблизителен - не го пазим на диска,
+            # за да се опита отново при следващото стартиране
+            if complete:
+                self._store_cached_analysis(opponent_name, analysis)
             logger.info(f"✅ Opponent analysis complete: {opponent_name}")
             
             return analysis
@@ -383,8 +688,73 @@ class OpponentIntelligence:
             logger.error(f"Failed to analyze opponent {opponent_name}: {e}")
             return {'name': opponent_name, 'error': str(e)}
     
-    def _gather_opponent_data(self, opponent_name: str) -> Dict:
-        """Събира данни за противника от различни източници"""
+    def get_cached(self, opponent_name: str) -> Optional[Dict]:
+        """Връща кеширан анализ (от паметта или от диска) без мрежови заявки"""
+        with self._cache_lock:
+            if opponent_name in self.opponent_cache:
+                return self.opponent_cache[opponent_name]
+        
+        cached = self._load_cached_analysis(opponent_name)
+        if cached is not None:
+            with self._cache_lock:
+                return self.opponent_cache.setdefault(opponent_name, cached)
+        return None
+    
+    def analyze_opponents(self, opponent_names: List[str], delay=None, on_result=None) -> Dict[str, Dict]:
+        """Анализира няколко противника паралелно - HTTP заявките се припокриват.
+        
+        delay() се извиква в работника преди всеки некеширан анализ; on_result(i, name, analysis)
+        се извиква в извикващата нишка по реда на завършване (analysis е None при изключение).
+        Връща успешно завършените анализи по реда на opponent_names.
+        """
+        if not opponent_names:
+            return {}
+        
+        def analyze(opponent_name: str) -> Dict:
+            if delay is not None and self.get_cached(opponent_name) is None:
+                delay()
+            return self.analyze_opponent(opponent_name)
+        
+        results = {}
+        workers = min(self.MAX_WORKERS, len(opponent_names))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ha-opp") as executor:
+            futures = {executor.submit(analyze, name): name for name in opponent_names}
+            
+            for i, future in enumerate(as_completed(futures), 1):
+                opponent_name = futures[future]
+                try:
+                    analysis = results[opponent_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error analyzing {opponent_name}: {e}")
+                    analysis = None
+                
+                if on_result is not None:
+                    on_result(i, opponent_name, analysis)
+        
+        # Запазваме подадения ред, независимо кой анализ е завършил пръв
+        return {name: results[name] for name in opponent_names if name in results}
+    
+    def set_standings(self, soup: BeautifulSoup):
+        """Запомня вече изтеглено класиране, за да не се тегли отново"""
+        with self._standings_lock:
+            self._standings_soup = soup
+            self._standings_time = time.time()
+    
+    def _get_standings_soup(self) -> BeautifulSoup:
+        """Връща класирането - изтегля го само веднъж на STANDINGS_TTL секунди"""
+        with self._standings_lock:
+            if self._standings_soup is None or time.time() - self._standings_time > self.STANDINGS_TTL:
+                standings_url = f"{self.base_url}/public_standings.inc"
+                response = self.session.get(standings_url)
+                self._standings_soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=_TABLES_ONLY)
+                self._standings_time = time.time()
+            return self._standings_soup
+    
+    def _gather_opponent_data(self, opponent_name: str) -> Tuple[Dict, bool]:
+        """Събира данни за противника от различни източници.
+        
+        Вторият елемент е False, ако класирането не можа да се изтегли.
+        """
         data = {
             'league_position': None,
             'recent_results': [],
@@ -394,24 +764,23 @@ class OpponentIntelligence:
         
         # Проверяваме класирането
         try:
-            standings_url = f"{self.base_url}/public_standings.inc"
-            response = self.session.get(standings_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            soup = self._get_standings_soup()
             data['league_position'] = self._find_team_in_standings(soup, opponent_name)
             
         except Exception as e:
             logger.warning(f"Could not get standings data: {e}")
+            return data, False
         
-        return data
+        return data, True
     
     def _find_team_in_standings(self, soup: BeautifulSoup, team_name: str) -> Dict:
         """Намира отбора в класирането"""
+        team_lc = team_name.lower()
         for table in soup.find_all('table'):
             for row in table.find_all('tr'):
                 cells = row.find_all(['td', 'th'])
                 for cell in cells:
-                    if team_name.lower() in cell.get_text().lower():
+                    if team_lc in cell.get_text().lower():
                         # Извличаме статистики от реда
                         row_data = [c.get_text().strip() for c in cells]
                         return {
@@ -429,7 +798,7 @@ class OpponentIntelligence:
         league_pos = data.get('league_position', {})
         if league_pos:
             try:
-                position = int(re.search(r'\d+', league_pos.get('position', '10')).group())
+                position = int(_RE_DIGITS.search(league_pos.get('position', '10')).group())
                 # По-ниска позиция = по-силен отбор
                 position_factor = max(0, (20 - position) * 2.5)
                 base_strength += position_factor
@@ -478,7 +847,7 @@ class OpponentIntelligence:
         league_pos = data.get('league_position', {})
         if league_pos:
             try:
-                position = int(re.search(r'\d+', league_pos.get('position', '10')).group())
+                position = int(_RE_DIGITS.search(league_pos.get('position', '10')).group())
                 if position > 10:
                     weaknesses.append('Общо слаб отбор')
                     weaknesses.append('Неопитни играчи')
@@ -501,7 +870,7 @@ class OpponentIntelligence:
         league_pos = data.get('league_position', {})
         if league_pos:
             try:
-                position = int(re.search(r'\d+', league_pos.get('position', '10')).group())
+                position = int(_RE_DIGITS.search(league_pos.get('position', '10')).group())
                 if position <= 5:
                     strengths.append('Топ отбор в лигата')
                     strengths.append('Опитни играчи')
@@ -554,16 +923,18 @@ class OpponentIntelligence:
         
         # Инструкции базирани на слабостите на противника
         for weakness in weaknesses:
-            if 'защита' in weakness.lower():
+            weakness_lc = weakness.lower()
+            if 'защита' in weakness_lc:
                 instructions.append('🔥 АТАКУВАЙТЕ АГРЕСИВНО - защитата им е слаба!')
-            elif 'атака' in weakness.lower():
+            elif 'атака' in weakness_lc:
                 instructions.append('🛡️ Играйте стабилно в защита - те са слаби в атака')
         
         # Предупреждения за силните страни
         for strength in strengths:
-            if 'атака' in strength.lower():
+            strength_lc = strength.lower()
+            if 'атака' in strength_lc:
                 instructions.append('⚠️ ВНИМАНИЕ! Силна атака - играйте компактно')
-            elif 'защита' in strength.lower():
+            elif 'защита' in strength_lc:
                 instructions.append('🎯 Търсете рядки моменти - защитата им е стабилна')
         
         # Общи инструкции според вероятността
@@ -621,27 +992,29 @@ class TacticalOptimizer:
             'team_character': ''
         }
         
-        # Групираме играчите по позиции
-        positions = {'goalkeeper': [], 'defender': [], 'center': [], 'forward': []}
+        # Едно минаване: рейтинги, най-добра позиция и сума по позиции
+        position_totals = {pos: 0.0 for pos in POSITION_TYPES}
+        position_counts = {pos: 0 for pos in POSITION_TYPES}
+        all_ratings = []
         
         for player in players:
-            # Определяме най-добрата позиция за всеки играч
-            best_pos = self._determine_best_position(player)
-            if best_pos in positions:
-                positions[best_pos].append(player)
+            ratings = player.position_ratings()
+            best_pos = max(ratings, key=ratings.get)
+            position_totals[best_pos] += ratings[best_pos]
+            position_counts[best_pos] += 1
+            all_ratings.append(ratings['forward'])
         
         # Анализираме силата на всяка позиция
-        for pos, pos_players in positions.items():
-            if pos_players:
-                avg_rating = sum(p.calculate_position_rating(pos) for p in pos_players) / len(pos_players)
+        for pos in POSITION_TYPES:
+            count = position_counts[pos]
+            if count:
                 analysis['position_strength'][pos] = {
-                    'average_rating': avg_rating,
-                    'player_count': len(pos_players),
-                    'depth': 'good' if len(pos_players) >= 3 else 'limited'
+                    'average_rating': position_totals[pos] / count,
+                    'player_count': count,
+                    'depth': 'good' if count >= 3 else 'limited'
                 }
         
         # Определяме характера на отбора
-        all_ratings = [p.calculate_position_rating('forward') for p in players]
         avg_team_rating = sum(all_ratings) / len(all_ratings) if all_ratings else 0
         
         if avg_team_rating > 70:
@@ -653,17 +1026,6 @@ class TacticalOptimizer:
         
         return analysis
     
-    def _determine_best_position(self, player: PlayerStats) -> str:
-        """Определя най-добрата позиция за играч"""
-        ratings = {
-            'goalkeeper': player.calculate_position_rating('goalkeeper'),
-            'defender': player.calculate_position_rating('defender'), 
-            'center': player.calculate_position_rating('center'),
-            'forward': player.calculate_position_rating('forward')
-        }
-        
-        return max(ratings, key=ratings.get)
-    
     def _select_optimal_lineup(self, players: List[PlayerStats]) -> Dict:
         """Избира оптималния състав"""
         lineup = {
@@ -673,20 +1035,19 @@ class TacticalOptimizer:
             'forwards': []
         }
         
-        # Сортираме играчите по рейтинг за всяка позиция
-        for pos in ['goalkeeper', 'defender', 'center', 'forward']:
-            pos_players = [(p, p.calculate_position_rating(pos)) for p in players]
-            pos_players.sort(key=lambda x: x[1], reverse=True)
+        # Избираме само най-добрите k играчи за всяка позиция (без пълно сортиране)
+        for pos, count in (('goalkeeper', 1), ('defender', 4), ('center', 2), ('forward', 4)):
+            best = heapq.nlargest(count, players, key=lambda p: p.calculate_position_rating(pos))
             
             if pos == 'goalkeeper':
-                if pos_players:
-                    lineup['goalkeeper'] = pos_players[0][0]
+                if best:
+                    lineup['goalkeeper'] = best[0]
             elif pos == 'defender':
-                lineup['defenders'] = [p[0] for p in pos_players[:4]]
+                lineup['defenders'] = best
             elif pos == 'center':
-                lineup['centers'] = [p[0] for p in pos_players[:2]]
+                lineup['centers'] = best
             else:  # forward
-                lineup['forwards'] = [p[0] for p in pos_players[:4]]
+                lineup['forwards'] = best
         
         return lineup
     
@@ -742,16 +1103,90 @@ class TacticalOptimizer:
         
         return setup
 
+# Съдържание на таба с официалното ръководство (статичен текст)
+_GUIDE_CONTENT = """
+🏒 АНАЛИЗ НА ОФИЦИАЛНОТО РЪКОВОДСТВО
+================================================
+
+📊 ОСНОВНИ АТРИБУТИ (базирано на ha-navod.eu):
+• Brána (GOA) - За вратари, основен атрибут
+• Obrana (DEF) - За защитници, основен за бранене
+• Útok (ATT) - За нападатели, основен за атакуване
+• Streľba (SHO) - За всички играчи при стрелби
+• Nahrávka/Kontrola puku (PAS) - Важно за центрове и вратари
+• Sila (STR) - Важно за всички, особено при вхвърляния
+• Rýchlosť (SPE) - Използва се от всички играчи
+• Sebaovládanie (DIS) - Контролира агресивността и вилучванията
+
+⚡ ТАКТИЧЕСКИ СПЕЦИАЛИЗАЦИИ:
+• Hurá systém - Без специализация, хаотично
+• Protiútoky - Защита + контраатаки (изисква DEF, SPE, DIS)
+• Napádanie - Агресивно отнемане (изисква STR, SPE, ATT)
+• Krátke nahrávky - Бързи подавания (изисква PAS, SPE, ATT)
+• Obrana (checking) - Само защита (изисква DEF, STR, DIS)
+• Streľba od modrej - Стрелби от защитници (изисква SHO, STR, PAS)
+• Nahrávky spoza brány - Подавания от зад вратата (изисква PAS, ATT, SPE)
+
+🏋️ ТРЕНИРОВКИ И ФОРМА:
+• Energia се губи в мачове и тренировки
+• Forma се влияе от почивка, представяне и "червена ръка"
+• Skúsenosť се получава само в мачове
+• Формите се влияят от лигово ниво
+
+💡 AI ПРЕПОРЪКИ БАЗИРАНИ НА РЪКОВОДСТВОТО:
+• Използвайте специализации според противника
+• Следете енергията на играчите (<60% = риск от контузия)
+• Центровете трябва да имат висока Sila за вхвърляния
+• Вратарите се уморяват според броя стрелби
+• Формацията трябва да съответства на специализацията
+• Агресивната игра увеличава вилученията при ниско Sebaovládanie
+
+🎯 ОПТИМИЗАЦИОННИ СТРАТЕГИИ:
+• Анализирайте противника и изберете контра-специализация
+• Ротирайте играчите за запазване на енергията
+• Използвайте "червената ръка" за подобряване на формата
+• Фокусирайте тренировките според ролята на играча
+• Следете съчетанието формация + специализация + играчи
+"""
+
+# Стилове на интерфейса (тъмна тема); 'font' е ключ от HockeyArenaGUI.fonts
+_STYLE_SPEC = {
+    'Title.TLabel': {'font': 'title',
+                     'background': '#0d1117',
+                     'foreground': '#f0f6fc'},
+    'Subtitle.TLabel': {'font': 'subtitle',
+                        'background': '#0d1117',
+                        'foreground': '#7c3aed'},
+    'Success.TLabel': {'foreground': '#238636'},
+    'Error.TLabel': {'foreground': '#da3633'},
+    'Warning.TLabel': {'foreground': '#fb8500'},
+    'Custom.TButton': {'font': 'body_bold'},
+}
+
 class HockeyArenaGUI:
     """Главна графична среда на системата"""
     
+    _styles_applied = False
+    
+    # Индекси на табовете в notebook-а
+    (TAB_DASHBOARD, TAB_LOGIN, TAB_TEAM, TAB_OPPONENTS, TAB_TACTICS,
+     TAB_MATCH, TAB_GUIDE, TAB_LOGS, TAB_SETTINGS) = range(9)
+    
+    # Интервал (ms), на който се прилагат натрупаните обновявания от фоновите задачи
+    UI_REFRESH_MS = 250
+    
+    # Брой нишки за фоновите задачи на интерфейса
+    BG_WORKERS = 2
+    
     def __init__(self):
+        _load_tkinter()
         self.root = tk.Tk()
         self.root.title("🏒 Hockey Arena Master AI v4.0")
         self.root.geometry("1600x1000")
         self.root.configure(bg='#0d1117')
         
         # Стилизиране
+        self.setup_fonts()
         self.setup_styles()
         
         # Системни компоненти
@@ -760,43 +1195,99 @@ class HockeyArenaGUI:
         self.running = False
         self.analysis_thread = None
         
+        # Общи фонови нишки за всички задачи на интерфейса (виж _run_in_background)
+        self._closing = False
+        self._tasks = queue.Queue()
+        for i in range(self.BG_WORKERS):
+            threading.Thread(target=self._background_worker, name=f"ha-bg_{i}", daemon=True).start()
+        self._pending_guide = None
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Фоновите задачи и статус съобщенията се проверяват от _poll_futures
+        self._futures = []
+        self._status_queue = queue.Queue()
+        
+        # Натрупани обновявания на списъка с противници (виж _schedule_ui)
+        self._ui_lock = threading.Lock()
+        self._ui_dirty = False
+        self._ui_new_opponents = []
+        self._ui_after_id = None
+        
         # Данни
         self.our_players = []
         self.opponents_data = {}
         
+        # Колоните на ростера за графиките (виж _roster_columns)
+        self._roster_source = None
+        self._roster_cache = ({}, (), ())
+        self._rating_stats = None
+        
+        # Версия на opponents_data - увеличава се при всеки запис (виж _store_opponent)
+        self._opp_version = 0
+        self._winprob_cache = (None, (), (), ())
+        self._opp_details_cache = {}
+        
+        # Състоянието на данните при последното успешно обновяване на таба с отбора
+        self._team_fp = None
+        
+        # Резултат от анализа на ръководството (показва се при отваряне на таба)
+        self._guide_status = "Анализиране на официалното ръководство..."
+        self._guide_content = None
+        
         # Настройка на GUI
+        self.setup_variables()
         self.setup_gui()
         
         # Автоматично анализиране на ръководството при стартиране
         self.analyze_official_guide()
+        
+        self._poll_futures()
+    
+    def setup_fonts(self):
+        """Създава именуваните шрифтове веднъж - widget-ите ги ползват по референция"""
+        self.fonts = {
+            'title': tkfont.Font(family='Segoe UI', size=18, weight='bold'),
+            'subtitle': tkfont.Font(family='Segoe UI', size=12, weight='bold'),
+            'body': tkfont.Font(family='Segoe UI', size=10),
+            'body_bold': tkfont.Font(family='Segoe UI', size=10, weight='bold'),
+            'entry': tkfont.Font(family='Segoe UI', size=12),
+            'emoji_logo': tkfont.Font(family='Segoe UI', size=48),
+        }
     
     def setup_styles(self):
-        """Настройва стиловете"""
+        """Настройва стиловете (само веднъж за инстанция)"""
+        if self._styles_applied:
+            return
+        
         self.style = ttk.Style()
         self.style.theme_use('clam')
         
         # Тъмна тема
-        self.style.configure('Title.TLabel', 
-                           font=('Segoe UI', 18, 'bold'),
-                           background='#0d1117',
-                           foreground='#f0f6fc')
-        
-        self.style.configure('Subtitle.TLabel',
-                           font=('Segoe UI', 12, 'bold'),
-                           background='#0d1117', 
-                           foreground='#7c3aed')
-        
-        self.style.configure('Success.TLabel',
-                           foreground='#238636')
+        for name, options in _STYLE_SPEC.items():
+            if 'font' in options:
+                options = dict(options, font=self.fonts[options['font']])
+            self.style.configure(name, **options)
         
-        self.style.configure('Error.TLabel',
-                           foreground='#da3633')
-        
-        self.style.configure('Warning.TLabel',
-                           foreground='#fb8500')
+        self._styles_applied = True
+    
+    def setup_variables(self):
+        """Създава Tk променливите (нужни са и преди табовете да бъдат построени)"""
+        self.deep_analysis_var = tk.BooleanVar(value=True)
+        self.auto_tactics_var = tk.BooleanVar(value=True)
+        self.formation_var = tk.StringVar(value="1-3-2")
+        self.specialization_var = tk.StringVar(value="hura_system")
+        self.match_opponent_var = tk.StringVar()
+        self.human_behavior_var = tk.BooleanVar(value=True)
+        self.auto_opponent_var = tk.BooleanVar(value=True)
+        self.deep_tactics_var = tk.BooleanVar(value=True)
+        self.min_delay_var = tk.DoubleVar(value=2.0)
+        self._delay_pending = False
+        self._delay_new_value = self.min_delay_var.get()
         
-        self.style.configure('Custom.TButton',
-                           font=('Segoe UI', 10, 'bold'))
+        # Съдържанието на ha_master_settings.json при последното зареждане/запазване
+        self._settings_saved = None
+        self.status_var = tk.StringVar(value="🔴 Offline")
+        self.login_status_var = tk.StringVar(value="Готов за стартиране...")
     
     def setup_gui(self):
         """Настройва основния интерфейс"""
@@ -815,7 +1306,7 @@ class HockeyArenaGUI:
         
         # Статус индикатор
         self.status_indicator = ttk.Label(title_frame, 
-                                        text="🔴 Offline", 
+                                        textvariable=self.status_var, 
                                         style='Error.TLabel')
         self.status_indicator.pack(side=tk.RIGHT)
         
@@ -823,33 +1314,93 @@ class HockeyArenaGUI:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Създаване на табовете
-        self.setup_dashboard_tab()
-        self.setup_login_tab()
-        self.setup_team_analysis_tab()
-        self.setup_opponent_analysis_tab()
-        self.setup_tactics_tab()
-        self.setup_match_preparation_tab()
-        self.setup_guide_tab()
-        self.setup_logs_tab()
-        self.setup_settings_tab()
-    
-    def setup_dashboard_tab(self):
-        """Главен dashboard"""
-        dashboard_frame = ttk.Frame(self.notebook)
-        self.notebook.add(dashboard_frame, text="📊 Dashboard")
+        # Табовете се създават празни и се построяват при първо отваряне
+        tabs = (
+            ("📊 Dashboard", self.setup_dashboard_tab),
+            ("🔐 Login & Analysis", self.setup_login_tab),
+            ("👥 Team Analysis", self.setup_team_analysis_tab),
+            ("🎯 Opponent Analysis", self.setup_opponent_analysis_tab),
+            ("⚡ Tactics & Strategy", self.setup_tactics_tab),
+            ("🥅 Match Preparation", self.setup_match_preparation_tab),
+            ("📚 Official Guide", self.setup_guide_tab),
+            ("📋 Logs & Debug", self.setup_logs_tab),
+            ("⚙️ Settings", self.setup_settings_tab)
+        )
         
+        self._tab_builders = {}
+        self._tab_steps = {}
+        for index, (text, builder) in enumerate(tabs):
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self._tab_builders[index] = (frame, builder)
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self._lazy_build)
+        
+        # При стартиране е нужен само Login табът
+        self._ensure_tab(self.TAB_LOGIN)
+        self.notebook.select(self.TAB_LOGIN)
+    
+    def _lazy_build(self, event=None):
+        """Построява избрания таб при първото му отваряне (на части между idle тиковете)"""
+        self._ensure_tab(self.notebook.index('current'), progressive=True)
+    
+    def _ensure_tab(self, index: int, progressive: bool = False):
+        """Построява таба, ако все още не е построен.
+        
+        Builder-ите генератори се изпълняват на части през after_idle при
+        progressive=True, иначе се довършват веднага.
+        """
+        entry = self._tab_builders.pop(index, None)
+        if entry:
+            frame, builder = entry
+            steps = builder(frame)
+            if steps is None:
+                return
+            self._tab_steps[index] = steps
+            if progressive:
+                self._drive_tab(index)
+                return
+        
+        if not progressive:
+            steps = self._tab_steps.pop(index, None)
+            if steps is not None:
+                for _ in steps:
+                    pass
+    
+    def _drive_tab(self, index: int):
+        """Изпълнява следващата част от построяването на таба"""
+        # Генераторът се вади докато работи, за да мине проверката на
+        # _tab_built в последната част (попълването на данните)
+        steps = self._tab_steps.pop(index, None)
+        if steps is None:
+            return
+        try:
+            next(steps)
+        except StopIteration:
+            return
+        self._tab_steps[index] = steps
+        self.root.after_idle(lambda: self._drive_tab(index))
+    
+    def _tab_built(self, index: int) -> bool:
+        """Проверява дали табът вече е построен"""
+        return index not in self._tab_builders and index not in self._tab_steps
+    
+    def setup_dashboard_tab(self, dashboard_frame):
+        """Главен dashboard"""
         # Бързи статистики
         stats_frame = ttk.LabelFrame(dashboard_frame, text="🏆 Quick Stats", padding=10)
         stats_frame.pack(fill=tk.X, pady=5)
         
-        self.stats_labels = {
-            'team_rating': ttk.Label(stats_frame, text="Team Rating: --"),
-            'next_opponent': ttk.Label(stats_frame, text="Next Opponent: --"),
-            'win_probability': ttk.Label(stats_frame, text="Win Probability: --%"),
-            'recommended_tactic': ttk.Label(stats_frame, text="Recommended Tactic: --")
+        initial = {
+            'team_rating': "Team Rating: --",
+            'next_opponent': "Next Opponent: --",
+            'win_probability': "Win Probability: --%",
+            'recommended_tactic': "Recommended Tactic: --"
         }
         
+        self.stats_vars = {k: tk.StringVar(value=v) for k, v in initial.items()}
+        self.stats_labels = {k: ttk.Label(stats_frame, textvariable=self.stats_vars[k]) for k in initial}
+        
         for i, (key, label) in enumerate(self.stats_labels.items()):
             label.grid(row=0, column=i, padx=20, sticky=tk.W)
         
@@ -869,35 +1420,84 @@ class HockeyArenaGUI:
         
         ttk.Button(actions_frame, text="📋 Export Report", 
                   command=self.export_comprehensive_report).pack(side=tk.LEFT, padx=5)
+        
+        self.update_dashboard()
     
     def setup_charts_section(self, parent):
         """Настройва секцията с графики"""
-        charts_frame = ttk.LabelFrame(parent, text="📈 Visual Analysis", padding=10)
-        charts_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.charts_frame = ttk.LabelFrame(parent, text="📈 Visual Analysis", padding=10)
+        self.charts_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # Matplotlib canvas
-        self.fig, ((self.ax1, self.ax2), (self.ax3, self.ax4)) = plt.subplots(2, 2, figsize=(12, 8))
-        self.fig.patch.set_facecolor('#0d1117')
+        # Графиките се създават при първите данни, дотогава - само етикет
+        self.chart_figures = []
+        self.chart_canvases = []
+        self.charts_placeholder = ttk.Label(self.charts_frame, text="📈 No data yet")
+        self.charts_placeholder.pack(expand=True)
         
-        for ax in [self.ax1, self.ax2, self.ax3, self.ax4]:
-            ax.set_facecolor('#161b22')
+        # Данните, с които е нарисувана всяка графика
+        self._chart_signatures = (None,) * 4
         
-        self.canvas = FigureCanvasTkAgg(self.fig, charts_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Artist-ите на хистограмата и стълбовете, обновявани на място
+        self._hist_patches = None
+        self._bars = None
         
         self.update_charts()
     
-    def setup_login_tab(self):
-        """Таб за логване"""
-        login_frame = ttk.Frame(self.notebook)
-        self.notebook.add(login_frame, text="🔐 Login & Analysis")
+    def _ensure_chart_canvas(self) -> bool:
+        """Създава четирите Matplotlib графики (всяка със собствен canvas) при първа нужда"""
+        if self.chart_canvases:
+            return True
         
+        try:
+            import matplotlib.style
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from numpy import histogram
+            # 'fast' включва опростяване на пътищата и chunksize за Agg
+            matplotlib.style.use(['dark_background', 'fast'])
+        except Exception as e:
+            logger.warning(f"Charts unavailable: {e}")
+            return False
+        
+        self.charts_placeholder.destroy()
+        
+        # За обновяване на хистограмата на място (виж update_charts)
+        self._np_histogram = histogram
+        
+        grid = ttk.Frame(self.charts_frame)
+        grid.pack(fill=tk.BOTH, expand=True)
+        
+        axes = []
+        for i in range(4):
+            row, column = divmod(i, 2)
+            grid.rowconfigure(row, weight=1)
+            grid.columnconfigure(column, weight=1)
+            
+            # Фиксирани полета, зададени веднъж - без layout solver (tight/constrained) при всяко рисуване
+            fig = Figure(figsize=(6, 4))
+            fig.subplots_adjust(left=0.14, right=0.96, top=0.88, bottom=0.22)
+            fig.patch.set_facecolor('#0d1117')
+            ax = fig.add_subplot()
+            ax.set_facecolor('#161b22')
+            
+            canvas = FigureCanvasTkAgg(fig, grid)
+            canvas.get_tk_widget().grid(row=row, column=column, sticky='nsew')
+            
+            self.chart_figures.append(fig)
+            self.chart_canvases.append(canvas)
+            axes.append(ax)
+        
+        self.ax1, self.ax2, self.ax3, self.ax4 = axes
+        return True
+    
+    def setup_login_tab(self, login_frame):
+        """Таб за логване"""
         # Центриране на съдържанието
         center_frame = ttk.Frame(login_frame)
         center_frame.pack(expand=True)
         
         # Logo и заглавие
-        ttk.Label(center_frame, text="🏒", font=('Segoe UI', 48)).pack(pady=10)
+        ttk.Label(center_frame, text="🏒", font=self.fonts['emoji_logo']).pack(pady=10)
         ttk.Label(center_frame, text="Hockey Arena Master AI", 
                  style='Title.TLabel').pack(pady=5)
         ttk.Label(center_frame, text="Най-напредналата AI система за доминиране", 
@@ -907,12 +1507,12 @@ class HockeyArenaGUI:
         creds_frame = ttk.LabelFrame(center_frame, text="Данни за достъп", padding=20)
         creds_frame.pack(pady=20)
         
-        ttk.Label(creds_frame, text="Username:", font=('Segoe UI', 12)).pack(anchor=tk.W)
-        self.username_entry = ttk.Entry(creds_frame, width=30, font=('Segoe UI', 12))
+        ttk.Label(creds_frame, text="Username:", font=self.fonts['entry']).pack(anchor=tk.W)
+        self.username_entry = ttk.Entry(creds_frame, width=30, font=self.fonts['entry'])
         self.username_entry.pack(pady=5, fill=tk.X)
         
-        ttk.Label(creds_frame, text="Password:", font=('Segoe UI', 12)).pack(anchor=tk.W, pady=(10,0))
-        self.password_entry = ttk.Entry(creds_frame, width=30, show="*", font=('Segoe UI', 12))
+        ttk.Label(creds_frame, text="Password:", font=self.fonts['entry']).pack(anchor=tk.W, pady=(10,0))
+        self.password_entry = ttk.Entry(creds_frame, width=30, show="*", font=self.fonts['entry'])
         self.password_entry.pack(pady=5, fill=tk.X)
         
         # Login бутон
@@ -923,7 +1523,7 @@ class HockeyArenaGUI:
         self.login_button.pack(pady=20, fill=tk.X)
         
         # Status и progress
-        self.login_status_label = ttk.Label(center_frame, text="Готов за стартиране...")
+        self.login_status_label = ttk.Label(center_frame, textvariable=self.login_status_var)
         self.login_status_label.pack(pady=5)
         
         self.progress = ttk.Progressbar(center_frame, mode='indeterminate', length=400)
@@ -933,19 +1533,14 @@ class HockeyArenaGUI:
         options_frame = ttk.LabelFrame(center_frame, text="Настройки за анализ", padding=10)
         options_frame.pack(pady=10)
         
-        self.deep_analysis_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(options_frame, text="Дълбок анализ на противници", 
                        variable=self.deep_analysis_var).pack(anchor=tk.W)
         
-        self.auto_tactics_var = tk.BooleanVar(value=True) 
         ttk.Checkbutton(options_frame, text="Автоматични тактически препоръки",
                        variable=self.auto_tactics_var).pack(anchor=tk.W)
     
-    def setup_team_analysis_tab(self):
-        """Таб за анализ на отбора"""
-        team_frame = ttk.Frame(self.notebook)
-        self.notebook.add(team_frame, text="👥 Team Analysis")
-        
+    def setup_team_analysis_tab(self, team_frame):
+        """Таб за анализ на отбора (генератор - строи се секция по секция)"""
         # Два стълба
         left_frame = ttk.Frame(team_frame)
         right_frame = ttk.Frame(team_frame)
@@ -958,6 +1553,7 @@ class HockeyArenaGUI:
         
         self.team_info_text = scrolledtext.ScrolledText(info_frame, height=8, width=50)
         self.team_info_text.pack(fill=tk.BOTH, expand=True)
+        yield
         
         # Играчи анализ
         players_frame = ttk.LabelFrame(left_frame, text="👤 Players Analysis", padding=10)
@@ -975,6 +1571,7 @@ class HockeyArenaGUI:
         
         self.players_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar_players.pack(side=tk.RIGHT, fill=tk.Y)
+        yield
         
         # Дясна страна - статистики и препоръки
         stats_frame = ttk.LabelFrame(right_frame, text="📊 Team Statistics", padding=10)
@@ -982,6 +1579,7 @@ class HockeyArenaGUI:
         
         self.team_stats_text = scrolledtext.ScrolledText(stats_frame, height=12, width=50)
         self.team_stats_text.pack(fill=tk.BOTH, expand=True)
+        yield
         
         # Препоръки
         recommendations_frame = ttk.LabelFrame(right_frame, text="💡 AI Recommendations", padding=10)
@@ -989,12 +1587,12 @@ class HockeyArenaGUI:
         
         self.recommendations_text = scrolledtext.ScrolledText(recommendations_frame, height=15, width=50)
         self.recommendations_text.pack(fill=tk.BOTH, expand=True)
+        yield
+        
+        self.update_team_analysis()
     
-    def setup_opponent_analysis_tab(self):
+    def setup_opponent_analysis_tab(self, opponent_frame):
         """Таб за анализ на противници"""
-        opponent_frame = ttk.Frame(self.notebook)
-        self.notebook.add(opponent_frame, text="🎯 Opponent Analysis")
-        
         # Търсене на противник
         search_frame = ttk.LabelFrame(opponent_frame, text="🔍 Opponent Search", padding=10)
         search_frame.pack(fill=tk.X, pady=5)
@@ -1002,7 +1600,7 @@ class HockeyArenaGUI:
         search_inner = ttk.Frame(search_frame)
         search_inner.pack(fill=tk.X)
         
-        ttk.Label(search_inner, text="Opponent Name:", font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=5)
+        ttk.Label(search_inner, text="Opponent Name:", font=self.fonts['body']).pack(side=tk.LEFT, padx=5)
         self.opponent_entry = ttk.Entry(search_inner, width=25)
         self.opponent_entry.pack(side=tk.LEFT, padx=5)
         
@@ -1020,11 +1618,14 @@ class HockeyArenaGUI:
         opponents_list_frame = ttk.Frame(results_frame)
         opponents_list_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
         
-        ttk.Label(opponents_list_frame, text="Analyzed Opponents:", font=('Segoe UI', 10, 'bold')).pack(anchor=tk.W)
+        ttk.Label(opponents_list_frame, text="Analyzed Opponents:", font=self.fonts['body_bold']).pack(anchor=tk.W)
         
-        self.opponents_listbox = tk.Listbox(opponents_list_frame, width=25, height=20)
-        self.opponents_listbox.pack(fill=tk.Y, expand=True)
-        self.opponents_listbox.bind('<<ListboxSelect>>', self.on_opponent_select)
+        # Treeview с id = името на противника - редовете се обновяват на място
+        self.opponents_tree = ttk.Treeview(opponents_list_frame, columns=(), show='tree',
+                                           selectmode='browse', height=20)
+        self.opponents_tree.column('#0', width=200)
+        self.opponents_tree.pack(fill=tk.Y, expand=True)
+        self.opponents_tree.bind('<<TreeviewSelect>>', self.on_opponent_select)
         
         # Детайли за избрания противник
         details_frame = ttk.Frame(results_frame)
@@ -1032,12 +1633,11 @@ class HockeyArenaGUI:
         
         self.opponent_details_text = scrolledtext.ScrolledText(details_frame, height=25, width=70)
         self.opponent_details_text.pack(fill=tk.BOTH, expand=True)
+        
+        self.update_opponents_list()
     
-    def setup_tactics_tab(self):
+    def setup_tactics_tab(self, tactics_frame):
         """Таб за тактики"""
-        tactics_frame = ttk.Frame(self.notebook)
-        self.notebook.add(tactics_frame, text="⚡ Tactics & Strategy")
-        
         # Секция за формации
         formation_frame = ttk.LabelFrame(tactics_frame, text="🏒 Formation Setup", padding=10)
         formation_frame.pack(fill=tk.X, pady=5)
@@ -1045,16 +1645,14 @@ class HockeyArenaGUI:
         formation_controls = ttk.Frame(formation_frame)
         formation_controls.pack(fill=tk.X)
         
-        ttk.Label(formation_controls, text="Formation:", font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=5)
-        self.formation_var = tk.StringVar(value="1-3-2")
+        ttk.Label(formation_controls, text="Formation:", font=self.fonts['body']).pack(side=tk.LEFT, padx=5)
         formation_combo = ttk.Combobox(formation_controls, textvariable=self.formation_var,
                                      values=["1-4-1", "1-3-2", "1-2-3"], width=10)
         formation_combo.pack(side=tk.LEFT, padx=5)
         
-        ttk.Label(formation_controls, text="Specialization:", font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=(20,5))
-        self.specialization_var = tk.StringVar(value="hura_system")
+        ttk.Label(formation_controls, text="Specialization:", font=self.fonts['body']).pack(side=tk.LEFT, padx=(20,5))
         spec_combo = ttk.Combobox(formation_controls, textvariable=self.specialization_var,
-                                values=list(TACTICAL_SPECIALIZATIONS.keys()), width=15)
+                                values=_TACTICAL_SPEC_KEYS, width=15)
         spec_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(formation_controls, text="🎯 Optimize", 
@@ -1067,11 +1665,8 @@ class HockeyArenaGUI:
         self.tactics_text = scrolledtext.ScrolledText(tactics_rec_frame, height=25, width=80)
         self.tactics_text.pack(fill=tk.BOTH, expand=True)
     
-    def setup_match_preparation_tab(self):
+    def setup_match_preparation_tab(self, match_frame):
         """Таб за подготовка за мач"""
-        match_frame = ttk.Frame(self.notebook)
-        self.notebook.add(match_frame, text="🥅 Match Preparation")
-        
         # Избор на противник за мач
         opponent_select_frame = ttk.LabelFrame(match_frame, text="🎯 Select Opponent", padding=10)
         opponent_select_frame.pack(fill=tk.X, pady=5)
@@ -1079,9 +1674,9 @@ class HockeyArenaGUI:
         select_controls = ttk.Frame(opponent_select_frame)
         select_controls.pack(fill=tk.X)
         
-        ttk.Label(select_controls, text="Next Match Opponent:", font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=5)
-        self.match_opponent_var = tk.StringVar()
-        self.match_opponent_combo = ttk.Combobox(select_controls, textvariable=self.match_opponent_var, width=25)
+        ttk.Label(select_controls, text="Next Match Opponent:", font=self.fonts['body']).pack(side=tk.LEFT, padx=5)
+        self.match_opponent_combo = ttk.Combobox(select_controls, textvariable=self.match_opponent_var,
+                                                 values=list(self.opponents_data.keys()), width=25)
         self.match_opponent_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(select_controls, text="📋 Prepare Match Plan", 
@@ -1107,16 +1702,13 @@ class HockeyArenaGUI:
         ttk.Button(export_frame, text="📱 Mobile Export", 
                   command=self.mobile_export).pack(side=tk.LEFT, padx=5)
     
-    def setup_guide_tab(self):
+    def setup_guide_tab(self, guide_frame):
         """Таб за официалното ръководство"""
-        guide_frame = ttk.Frame(self.notebook)
-        self.notebook.add(guide_frame, text="📚 Official Guide")
-        
         # Статус на анализа на ръководството
         status_frame = ttk.LabelFrame(guide_frame, text="📊 Guide Analysis Status", padding=10)
         status_frame.pack(fill=tk.X, pady=5)
         
-        self.guide_status_label = ttk.Label(status_frame, text="Анализиране на официалното ръководство...")
+        self.guide_status_label = ttk.Label(status_frame, text=self._guide_status)
         self.guide_status_label.pack(anchor=tk.W)
         
         # Съдържание на ръководството
@@ -1125,6 +1717,8 @@ class HockeyArenaGUI:
         
         self.guide_content_text = scrolledtext.ScrolledText(content_frame, height=25, width=80)
         self.guide_content_text.pack(fill=tk.BOTH, expand=True)
+        if self._guide_content:
+            self._set_guide_content(self._guide_content)
         
         # Контроли
         controls_frame = ttk.Frame(guide_frame)
@@ -1136,11 +1730,8 @@ class HockeyArenaGUI:
         ttk.Button(controls_frame, text="🌐 Open Official Guide", 
                   command=lambda: webbrowser.open("https://www.ha-navod.eu")).pack(side=tk.LEFT, padx=5)
     
-    def setup_logs_tab(self):
+    def setup_logs_tab(self, logs_frame):
         """Таб за логове и debug"""
-        logs_frame = ttk.Frame(self.notebook)
-        self.notebook.add(logs_frame, text="📋 Logs & Debug")
-        
         # Контроли за логове
         controls_frame = ttk.Frame(logs_frame)
         controls_frame.pack(fill=tk.X, pady=5)
@@ -1164,24 +1755,18 @@ class HockeyArenaGUI:
         # Автоматично зареждане на логовете
         self.refresh_logs()
     
-    def setup_settings_tab(self):
+    def setup_settings_tab(self, settings_frame):
         """Таб за настройки"""
-        settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(settings_frame, text="⚙️ Settings")
-        
         # Поведенчески настройки
         behavior_frame = ttk.LabelFrame(settings_frame, text="🤖 AI Behavior Settings", padding=10)
         behavior_frame.pack(fill=tk.X, pady=5)
         
-        self.human_behavior_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(behavior_frame, text="Human-like behavior simulation", 
                        variable=self.human_behavior_var).pack(anchor=tk.W)
         
-        self.auto_opponent_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(behavior_frame, text="Auto-analyze opponents", 
                        variable=self.auto_opponent_var).pack(anchor=tk.W)
         
-        self.deep_tactics_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(behavior_frame, text="Deep tactical analysis", 
                        variable=self.deep_tactics_var).pack(anchor=tk.W)
         
@@ -1190,12 +1775,11 @@ class HockeyArenaGUI:
         timing_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(timing_frame, text="Minimum delay between requests (seconds):").pack(anchor=tk.W)
-        self.min_delay_var = tk.DoubleVar(value=2.0)
         delay_scale = ttk.Scale(timing_frame, from_=0.5, to=10.0, variable=self.min_delay_var,
                                orient=tk.HORIZONTAL, length=300)
         delay_scale.pack(anchor=tk.W, pady=5)
         
-        self.delay_value_label = ttk.Label(timing_frame, text="2.0s")
+        self.delay_value_label = ttk.Label(timing_frame, text=f"{self.min_delay_var.get():.1f}s")
         self.delay_value_label.pack(anchor=tk.W)
         delay_scale.configure(command=self.update_delay_label)
         
@@ -1217,68 +1801,54 @@ class HockeyArenaGUI:
     
     def analyze_official_guide(self):
         """Анализира официалното ръководство в отделен thread"""
+        # Ръководството вече е анализирано - показваме резултата директно в main thread-а
+        if any(self.guide_analyzer.guide_data.values()):
+            self._show_guide_result(_GUIDE_CONTENT, "✅ Анализът на ръководството е завършен")
+            return
+        
+        # Предишният анализ още работи - не пускаме втори
+        if self._pending_guide is not None and not self._pending_guide.done():
+            return
+        
         def analyze():
             try:
-                self.guide_status_label.configure(text="🔄 Анализиране на официалното ръководство...")
+                self._call_ui(lambda: self._set_guide_status("🔄 Анализиране на официалното ръководство..."))
                 guide_data = self.guide_analyzer.analyze_official_guide()
                 
                 # Показване на резултатите
-                content = """
-🏒 АНАЛИЗ НА ОФИЦИАЛНОТО РЪКОВОДСТВО
-================================================
-
-📊 ОСНОВНИ АТРИБУТИ (базирано на ha-navod.eu):
-• Brána (GOA) - За вратари, основен атрибут
-• Obrana (DEF) - За защитници, основен за бранене
-• Útok (ATT) - За нападатели, основен за атакуване
-• Streľba (SHO) - За всички играчи при стрелби
-• Nahrávka/Kontrola puku (PAS) - Важно за центрове и вратари
-• Sila (STR) - Важно за всички, особено при вхвърляния
-• Rýchlosť (SPE) - Използва се от всички играчи
-• Sebaovládanie (DIS) - Контролира агресивността и вилучванията
-
-⚡ ТАКТИЧЕСКИ СПЕЦИАЛИЗАЦИИ:
-• Hurá systém - Без специализация, хаотично
-• Protiútoky - Защита + контраатаки (изисква DEF, SPE, DIS)
-• Napádanie - Агресивно отнемане (изисква STR, SPE, ATT)
-• Krátke nahrávky - Бързи подавания (изисква PAS, SPE, ATT)
-• Obrana (checking) - Само защита (изисква DEF, STR, DIS)
-• Streľba od modrej - Стрелби от защитници (изисква SHO, STR, PAS)
-• Nahrávky spoza brány - Подавания от зад вратата (изисква PAS, ATT, SPE)
-
-🏋️ ТРЕНИРОВКИ И ФОРМА:
-• Energia се губи в мачове и тренировки
-• Forma се влияе от почивка, представяне и "червена ръка"
-• Skúsenosť се получава само в мачове
-• Формите се влияят от лигово ниво
-
-💡 AI ПРЕПОРЪКИ БАЗИРАНИ НА РЪКОВОДСТВОТО:
-• Използвайте специализации според противника
-• Следете енергията на играчите (<60% = риск от контузия)
-• Центровете трябва да имат висока Sila за вхвърляния
-• Вратарите се уморяват според броя стрелби
-• Формацията трябва да съответства на специализацията
-• Агресивната игра увеличава вилученията при ниско Sebaovládanie
-
-🎯 ОПТИМИЗАЦИОННИ СТРАТЕГИИ:
-• Анализирайте противника и изберете контра-специализация
-• Ротирайте играчите за запазване на енергията
-• Използвайте "червената ръка" за подобряване на формата
-• Фокусирайте тренировките според ролята на играча
-• Следете съчетанието формация + специализация + играчи
-"""
+                content = _GUIDE_CONTENT
                 
-                self.root.after(0, lambda: self.guide_content_text.delete(1.0, tk.END))
-                self.root.after(0, lambda: self.guide_content_text.insert(tk.END, content))
-                self.root.after(0, lambda: self.guide_status_label.configure(text="✅ Анализът на ръководството е завършен"))
+                self._call_ui(lambda: self._show_guide_result(content, "✅ Анализът на ръководството е завършен"))
                 
             except Exception as e:
                 error_msg = f"❌ Грешка при анализ на ръководството: {str(e)}"
-                self.root.after(0, lambda: self.guide_status_label.configure(text=error_msg))
+                self._call_ui(lambda: self._set_guide_status(error_msg))
                 logger.error(f"Guide analysis error: {e}")
         
-        thread = threading.Thread(target=analyze, daemon=True)
-        thread.start()
+        self._pending_guide = self._run_in_background(analyze)
+    
+    def _set_guide_status(self, text: str):
+        """Запомня статуса на ръководството и го показва, ако табът е построен"""
+        self._guide_status = text
+        if self._tab_built(self.TAB_GUIDE):
+            self.guide_status_label.configure(text=text)
+    
+    def _set_guide_content(self, content: str):
+        """Запомня съдържанието на ръководството и го показва, ако табът е построен"""
+        self._guide_content = content
+        if self._tab_built(self.TAB_GUIDE):
+            # Едно вмъкване на целия текст, докато полето е само за четене
+            widget = self.guide_content_text
+            widget.configure(state='normal')
+            widget.delete('1.0', tk.END)
+            widget.insert('1.0', content)
+            widget.configure(state='disabled')
+            widget.see('1.0')
+    
+    def _show_guide_result(self, content: str, status: str):
+        """Показва резултата от анализа на ръководството с едно обновяване"""
+        self._set_guide_content(content)
+        self._set_guide_status(status)
     
     def start_comprehensive_analysis(self):
         """Стартира пълния анализ"""
@@ -1296,57 +1866,126 @@ class HockeyArenaGUI:
         self.running = True
         self.login_button.configure(state='disabled', text="🔄 Анализиране...")
         self.progress.start()
-        self.status_indicator.configure(text="🟡 Connecting...", style='Warning.TLabel')
+        self.status_var.set("🟡 Connecting...")
+        self.status_indicator.configure(style='Warning.TLabel')
         
-        # Стартиране в отделен thread
-        self.analysis_thread = threading.Thread(
-            target=self.run_comprehensive_analysis, 
-            args=(username, password),
-            daemon=True
-        )
-        self.analysis_thread.start()
+        # Стартиране във фоновия pool
+        self.analysis_thread = self._submit(self._on_analysis_done,
+                                            self.run_comprehensive_analysis, username, password)
     
     def run_comprehensive_analysis(self, username: str, password: str):
-        """Изпълнява пълния анализ"""
+        """Изпълнява пълния анализ (грешките се обработват в _on_analysis_done)"""
+        self.update_status("🔐 Логване с Brave браузър симулация...")
+        
+        # Създаване на AI системата
+        self.analyzer = HockeyArenaMasterAI(username, password)
+        
+        # Стъпка 1: Логване
+        if not self.analyzer.login_with_human_behavior():
+            raise Exception("Неуспешно логване - проверете данните")
+        
+        self.update_status("✅ Успешно логване! Анализиране на отбора...")
+        
+        # Стъпка 2: Анализ на нашия отбор
+        self.analyzer.analyze_our_team()
+        self.our_players = self.analyzer.get_our_players()
+        
+        self.update_status("🎯 Анализиране на противници...")
+        
+        # Стъпка 3: Анализ на противници
+        if self.deep_analysis_var.get():
+            opponents = self.analyzer.discover_and_analyze_opponents()
+            self.opponents_data = opponents
+            self._opp_version += 1
+        
+        self.update_status("⚡ Генериране на тактически препоръки...")
+        
+        # Стъпка 4: Генериране на тактики
+        if self.auto_tactics_var.get():
+            self.analyzer.generate_optimal_tactics()
+    
+    def _on_analysis_done(self, future):
+        """Финализира пълния анализ в GUI нишката"""
+        error = future.exception()
+        if error is None:
+            self.analysis_completed_successfully()
+        else:
+            self.analysis_failed(str(error))
+    
+    def _background_worker(self):
+        """Изпълнява фоновите задачи една по една.
+        
+        Нишките са daemon - затварянето на прозореца не чака текуща мрежова заявка.
+        """
+        while True:
+            future, fn, args = self._tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+    
+    def _run_in_background(self, fn, *args) -> Future:
+        """Слага задача в опашката на фоновите нишки"""
+        future = Future()
+        if self._closing:
+            future.cancel()
+        else:
+            self._tasks.put((future, fn, args))
+        return future
+    
+    def _submit(self, on_done, fn, *args):
+        """Пуска фонова задача; on_done(future) се вика в GUI нишката"""
+        future = self._run_in_background(fn, *args)
+        self._futures.append((future, on_done))
+        return future
+    
+    def _call_ui(self, callback):
+        """Предава callback от фонова нишка към GUI нишката (нищо не прави след затваряне)"""
+        if self._closing:
+            return
         try:
-            self.update_status("🔐 Логване с Brave браузър симулация...")
-            
-            # Създаване на AI системата
-            self.analyzer = HockeyArenaMasterAI(username, password)
-            
-            # Стъпка 1: Логване
-            if not self.analyzer.login_with_human_behavior():
-                raise Exception("Неуспешно логване - проверете данните")
-            
-            self.update_status("✅ Успешно логване! Анализиране на отбора...")
-            
-            # Стъпка 2: Анализ на нашия отбор
-            self.analyzer.analyze_our_team()
-            self.our_players = self.analyzer.get_our_players()
-            
-            self.update_status("🎯 Анализиране на противници...")
-            
-            # Стъпка 3: Анализ на противници
-            if self.deep_analysis_var.get():
-                opponents = self.analyzer.discover_and_analyze_opponents()
-                self.opponents_data = opponents
-            
-            self.update_status("⚡ Генериране на тактически препоръки...")
-            
-            # Стъпка 4: Генериране на тактики
-            if self.auto_tactics_var.get():
-                self.analyzer.generate_optimal_tactics()
-            
-            # Финализиране
-            self.root.after(0, self.analysis_completed_successfully)
-            
-        except Exception as e:
-            error_msg = str(e)
-            self.root.after(0, lambda: self.analysis_failed(error_msg))
+            self.root.after(0, callback)
+        except (tk.TclError, RuntimeError):
+            # Прозорецът е унищожен между проверката и извикването
+            pass
+    
+    def _on_close(self):
+        """Затваря прозореца - фоновите задачи вече не пипат интерфейса"""
+        self._closing = True
+        self.root.destroy()
+    
+    def _poll_futures(self):
+        """Периодично показва статуса и финализира завършените фонови задачи"""
+        # Показваме само последното съобщение от опашката
+        message = None
+        while True:
+            try:
+                message = self._status_queue.get_nowait()
+            except queue.Empty:
+                break
+        if message is not None:
+            self.login_status_var.set(message)
+        
+        # on_done може да пусне нова задача, затова обхождаме копие
+        futures, self._futures = self._futures, []
+        for future, on_done in futures:
+            if not future.done():
+                self._futures.append((future, on_done))
+                continue
+            try:
+                on_done(future)
+            except Exception as e:
+                logger.error(f"Background task callback error: {e}")
+        
+        self.root.after(100, self._poll_futures)
     
     def update_status(self, message: str):
-        """Обновява статуса"""
-        self.root.after(0, lambda: self.login_status_label.configure(text=message))
+        """Обновява статуса (показва се при следващата проверка на _poll_futures)"""
+        self._status_queue.put(message)
         logger.info(message)
     
     def analysis_completed_successfully(self):
@@ -1354,7 +1993,8 @@ class HockeyArenaGUI:
         self.running = False
         self.login_button.configure(state='normal', text="🚀 Стартиране на AI Анализ")
         self.progress.stop()
-        self.status_indicator.configure(text="🟢 Online & Ready", style='Success.TLabel')
+        self.status_var.set("🟢 Online & Ready")
+        self.status_indicator.configure(style='Success.TLabel')
         
         # Обновяване на всички табове с данни
         self.update_dashboard()
@@ -1371,29 +2011,30 @@ class HockeyArenaGUI:
         self.running = False
         self.login_button.configure(state='normal', text="🚀 Стартиране на AI Анализ")
         self.progress.stop()
-        self.status_indicator.configure(text="🔴 Analysis Failed", style='Error.TLabel')
+        self.status_var.set("🔴 Analysis Failed")
+        self.status_indicator.configure(style='Error.TLabel')
         
         messagebox.showerror("Грешка", f"❌ Анализът се провали:\n\n{error_msg}")
     
     def update_dashboard(self):
         """Обновява dashboard-а"""
-        if not self.analyzer:
+        if not self.analyzer or not self._tab_built(self.TAB_DASHBOARD):
             return
         
         try:
             # Обновяване на бързите статистики
             team_rating = self.analyzer.get_team_rating()
-            self.stats_labels['team_rating'].configure(text=f"Team Rating: {team_rating:.1f}/100")
+            self.stats_vars['team_rating'].set(f"Team Rating: {team_rating:.1f}/100")
             
             next_opponent = self.analyzer.get_next_opponent()
-            self.stats_labels['next_opponent'].configure(text=f"Next Opponent: {next_opponent}")
+            self.stats_vars['next_opponent'].set(f"Next Opponent: {next_opponent}")
             
             if next_opponent and next_opponent in self.opponents_data:
                 win_prob = self.opponents_data[next_opponent].get('win_probability', 50)
-                self.stats_labels['win_probability'].configure(text=f"Win Probability: {win_prob:.1f}%")
+                self.stats_vars['win_probability'].set(f"Win Probability: {win_prob:.1f}%")
             
             recommended_tactic = self.analyzer.get_recommended_tactic()
-            self.stats_labels['recommended_tactic'].configure(text=f"Recommended Tactic: {recommended_tactic}")
+            self.stats_vars['recommended_tactic'].set(f"Recommended Tactic: {recommended_tactic}")
             
             # Обновяване на графиките
             if CHARTS_AVAILABLE:
@@ -1402,148 +2043,354 @@ class HockeyArenaGUI:
         except Exception as e:
             logger.error(f"Dashboard update error: {e}")
     
+    def _data_state(self) -> Tuple:
+        """Връща текущото състояние на данните (за пропускане на обновявания без промяна)"""
+        return (self.analyzer, self.our_players, len(self.our_players), self._opp_version)
+    
+    @staticmethod
+    def _same_state(previous: Optional[Tuple], state: Tuple) -> bool:
+        """Сравнява две състояния от _data_state"""
+        # Анализаторът и списъкът с играчи се сравняват по идентичност - подменят се при нов анализ
+        return (previous is not None and previous[0] is state[0] and previous[1] is state[1]
+                and previous[2:] == state[2:])
+    
     def update_charts(self):
-        """Обновява графиките"""
-        if not CHARTS_AVAILABLE:
+        """Обновява графиките (прерисуват се само графиките с променени данни)"""
+        if not CHARTS_AVAILABLE or not self._tab_built(self.TAB_DASHBOARD):
+            return
+        
+        # Без анализ остава етикетът "No data yet"
+        if self.analyzer is None or not self._ensure_chart_canvas():
             return
         
         try:
-            # Почистваме графиките
-            for ax in [self.ax1, self.ax2, self.ax3, self.ax4]:
-                ax.clear()
-                ax.set_facecolor('#161b22')
+            has_data = bool(self.analyzer and self.our_players)
             
-            if self.analyzer and self.our_players:
-                # Графика 1: Разпределение по позиции
-                positions = {}
-                for player in self.our_players:
-                    pos = player.get('best_position', 'Unknown')
-                    positions[pos] = positions.get(pos, 0) + 1
+            if has_data:
+                positions, ages, ratings = self._roster_columns()
+                
+                opponent_names, win_probs, bar_colors = self._top_opponent_win_probs()
                 
-                if positions:
+                signatures = (tuple(positions.items()), ages, ratings,
+                              tuple(zip(opponent_names, win_probs)))
+            else:
+                signatures = ('placeholder',) * 4
+            
+            # Графиките с непроменени данни не се пипат
+            changed = [new != old for new, old in zip(signatures, self._chart_signatures)]
+            if not any(changed):
+                return
+            
+            # Вече нарисуваните хистограма и стълбове се обновяват на място без ax.clear()
+            reuse_hist = has_data and bool(ages) and self._hist_patches is not None
+            reuse_bars = (has_data and self._bars is not None
+                          and len(self._bars) == len(opponent_names))
+            in_place = (False, reuse_hist, False, reuse_bars)
+            
+            axes = [self.ax1, self.ax2, self.ax3, self.ax4]
+            for ax, is_changed, keep in zip(axes, changed, in_place):
+                if is_changed and not keep:
+                    ax.clear()
+                    ax.set_facecolor('#161b22')
+            
+            # ax.clear() премахва и запазените artist-и
+            if changed[1] and not reuse_hist:
+                self._hist_patches = None
+            if changed[3] and not reuse_bars:
+                self._bars = None
+            
+            if has_data:
+                # Графика 1: Разпределение по позиции
+                if changed[0] and positions:
                     self.ax1.pie(positions.values(), labels=positions.keys(), autopct='%1.1f%%',
                                colors=['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4'])
                     self.ax1.set_title('Position Distribution', color='white', fontsize=12)
                 
                 # Графика 2: Възрастова структура
-                ages = [p.get('age', 25) for p in self.our_players if p.get('age')]
-                if ages:
-                    self.ax2.hist(ages, bins=10, color='#7c3aed', alpha=0.7, edgecolor='white')
-                    self.ax2.set_title('Age Distribution', color='white', fontsize=12)
-                    self.ax2.set_xlabel('Age', color='white')
-                    self.ax2.set_ylabel('Count', color='white')
-                    self.ax2.tick_params(colors='white')
+                if changed[1] and ages:
+                    if reuse_hist:
+                        counts, edges = self._np_histogram(ages, bins=len(self._hist_patches))
+                        for patch, count, left, right in zip(self._hist_patches, counts, edges[:-1], edges[1:]):
+                            patch.set_x(left)
+                            patch.set_width(right - left)
+                            patch.set_height(count)
+                        self.ax2.relim()
+                        self.ax2.autoscale_view()
+                    else:
+                        _, _, self._hist_patches = self.ax2.hist(ages, bins=10, color='#7c3aed',
+                                                                 alpha=0.7, edgecolor='white')
+                        self.ax2.set_title('Age Distribution', color='white', fontsize=12)
+                        self.ax2.set_xlabel('Age', color='white')
+                        self.ax2.set_ylabel('Count', color='white')
+                        self.ax2.tick_params(colors='white')
                 
                 # Графика 3: Рейтинги на играчите
-                ratings = [p.get('ai_rating', 0) for p in self.our_players if p.get('ai_rating')]
-                if ratings:
-                    self.ax3.boxplot(ratings, patch_artist=True, 
-                                   boxprops=dict(facecolor='#45b7d1', alpha=0.7))
+                if changed[2] and ratings:
+                    self.ax3.bxp(self._rating_box_stats(), patch_artist=True, 
+                                 boxprops=dict(facecolor='#45b7d1', alpha=0.7))
                     self.ax3.set_title('Player Ratings Distribution', color='white', fontsize=12)
                     self.ax3.set_ylabel('Rating', color='white')
                     self.ax3.tick_params(colors='white')
                 
                 # Графика 4: Сравнение с противници
-                if self.opponents_data:
-                    opponent_names = list(self.opponents_data.keys())[:5]
-                    win_probs = [self.opponents_data[name].get('win_probability', 50) 
-                               for name in opponent_names]
-                    
-                    bars = self.ax4.bar(range(len(opponent_names)), win_probs, 
-                                      color=['#238636' if p > 60 else '#fb8500' if p > 40 else '#da3633' 
-                                            for p in win_probs])
-                    self.ax4.set_title('Win Probability vs Top Opponents', color='white', fontsize=12)
-                    self.ax4.set_ylabel('Win Probability (%)', color='white')
-                    self.ax4.set_xticks(range(len(opponent_names)))
+                if changed[3] and opponent_names:
+                    if reuse_bars:
+                        for bar, prob, color in zip(self._bars, win_probs, bar_colors):
+                            bar.set_height(prob)
+                            bar.set_color(color)
+                        self.ax4.relim()
+                        self.ax4.autoscale_view()
+                    else:
+                        self._bars = self.ax4.bar(range(len(opponent_names)), win_probs, color=bar_colors)
+                        self.ax4.set_title('Win Probability vs Top Opponents', color='white', fontsize=12)
+                        self.ax4.set_ylabel('Win Probability (%)', color='white')
+                        self.ax4.set_xticks(range(len(opponent_names)))
+                        self.ax4.tick_params(colors='white')
                     self.ax4.set_xticklabels([name[:10] for name in opponent_names], 
                                            rotation=45, color='white')
-                    self.ax4.tick_params(colors='white')
             else:
                 # Placeholder графики
-                for i, ax in enumerate([self.ax1, self.ax2, self.ax3, self.ax4]):
-                    ax.text(0.5, 0.5, f'Chart {i+1}\nNo Data Available', 
-                           transform=ax.transAxes, ha='center', va='center',
-                           color='white', fontsize=12)
-                    ax.set_title(f'Chart {i+1}', color='white')
+                for i, ax in enumerate(axes):
+                    if changed[i]:
+                        ax.text(0.5, 0.5, f'Chart {i+1}\nNo Data Available', 
+                               transform=ax.transAxes, ha='center', va='center',
+                               color='white', fontsize=12)
+                        ax.set_title(f'Chart {i+1}', color='white')
+            
+            self._chart_signatures = signatures
             
-            self.fig.tight_layout()
-            self.canvas.draw()
+            # Прерисуваме само canvas-ите на променените графики
+            for canvas, is_changed in zip(self.chart_canvases, changed):
+                if is_changed:
+                    canvas.draw_idle()
             
         except Exception as e:
             logger.error(f"Charts update error: {e}")
     
+    def _top_opponent_win_probs(self):
+        """Връща имената, вероятностите за победа и цветовете на стълбовете за първите 5 противника.
+        
+        Пресмятат се наново само след запис в opponents_data.
+        """
+        if self._winprob_cache[0] != self._opp_version:
+            names = tuple(self.opponents_data)[:5]
+            probs = tuple(self.opponents_data[name].get('win_probability', 50) for name in names)
+            colors = tuple('#238636' if p > 60 else '#fb8500' if p > 40 else '#da3633' for p in probs)
+            self._winprob_cache = (self._opp_version, names, probs, colors)
+        
+        return self._winprob_cache[1:]
+    
+    def _store_opponent(self, name: str, analysis: Dict):
+        """Записва анализа на противник и обезсилва кешираните данни за графиките"""
+        self.opponents_data[name] = analysis
+        self._opp_version += 1
+    
+    def _roster_columns(self):
+        """Връща позициите, възрастите и рейтингите на играчите, извлечени с едно минаване.
+        
+        Пресмятат се наново само когато self.our_players е заменен с нов списък.
+        """
+        if self._roster_source is not self.our_players:
+            positions = {}
+            ages = []
+            ratings = []
+            for player in self.our_players:
+                pos = player.get('best_position', 'Unknown')
+                positions[pos] = positions.get(pos, 0) + 1
+                age = player.get('age')
+                if age:
+                    ages.append(age)
+                rating = player.get('ai_rating')
+                if rating:
+                    ratings.append(rating)
+            
+            self._roster_cache = (positions, tuple(ages), tuple(ratings))
+            self._roster_source = self.our_players
+            self._rating_stats = None
+        
+        return self._roster_cache
+    
+    def _rating_box_stats(self) -> List[Dict]:
+        """Квартилите, мустаците и outlier-ите на рейтингите за ax3.bxp (кеш до смяна на ростера)"""
+        if self._rating_stats is None:
+            from matplotlib.cbook import boxplot_stats
+            self._rating_stats = boxplot_stats(self._roster_columns()[2])
+        
+        return self._rating_stats
+    
+    @staticmethod
+    def _replace_text(widget, content: str):
+        """Заменя съдържанието на текстово поле, като пренаписва само редовете след общото начало.
+        
+        Сравнява се по редове, защото индексите "+N chars" на Tk не съвпадат
+        с дължината на Python низовете при емоджита.
+        """
+        old_lines = widget.get('1.0', 'end-1c').split('\n')
+        new_lines = content.split('\n')
+        if old_lines == new_lines:
+            return
+        
+        common = 0
+        for old, new in zip(old_lines, new_lines):
+            if old != new:
+                break
+            common += 1
+        
+        # Последният общ ред се пренаписва, ако единият текст свършва на него
+        common = min(common, len(old_lines) - 1, len(new_lines) - 1)
+        
+        start = f"{common + 1}.0"
+        widget.delete(start, tk.END)
+        widget.insert(start, '\n'.join(new_lines[common:]))
+    
     def update_team_analysis(self):
         """Обновява анализа на отбора"""
-        if not self.analyzer:
+        if not self.analyzer or not self._tab_built(self.TAB_TEAM):
+            return
+        
+        state = self._data_state()
+        if self._same_state(self._team_fp, state):
             return
         
         try:
             # Обновяване на информацията за отбора
             team_info = self.analyzer.get_team_info_summary()
-            self.team_info_text.delete(1.0, tk.END)
-            self.team_info_text.insert(tk.END, team_info)
+            self._replace_text(self.team_info_text, team_info)
             
-            # Обновяване на списъка с играчи
-            for item in self.players_tree.get_children():
-                self.players_tree.delete(item)
+            # Обновяване на списъка с играчи - редовете се подготвят предварително,
+            # старите се трият с едно извикване и новите се вмъкват без междинна обработка на събития
+            rows = [(player.get('name', 'Unknown'),
+                     (player.get('best_position', 'Unknown'), player['rating_str'],
+                      player.get('age', 0), f"{player.get('form', 100)}%"))
+                    for player in self.our_players]
             
-            for player in self.our_players:
-                name = player.get('name', 'Unknown')
-                position = player.get('best_position', 'Unknown')
-                rating = player.get('ai_rating', 0)
-                age = player.get('age', 0)
-                form = player.get('form', 100)
-                
-                self.players_tree.insert('', 'end', text=name, 
-                                       values=(position, f"{rating:.1f}", age, f"{form}%"))
+            tree = self.players_tree
+            children = tree.get_children()
+            if children:
+                tree.delete(*children)
+            
+            for name, values in rows:
+                tree.insert('', 'end', text=name, values=values)
             
             # Обновяване на статистиките
             team_stats = self.analyzer.get_detailed_team_stats()
-            self.team_stats_text.delete(1.0, tk.END)
-            self.team_stats_text.insert(tk.END, team_stats)
+            self._replace_text(self.team_stats_text, team_stats)
             
             # Обновяване на препоръките
             recommendations = self.analyzer.get_team_recommendations()
-            self.recommendations_text.delete(1.0, tk.END)
-            self.recommendations_text.insert(tk.END, recommendations)
+            self._replace_text(self.recommendations_text, recommendations)
             
+            # Запомняме състоянието само след успешно обновяване - при грешка следващото опитва отново
+            self._team_fp = state
+        
         except Exception as e:
             logger.error(f"Team analysis update error: {e}")
     
     def update_opponents_list(self):
         """Обновява списъка с противници"""
-        self.opponents_listbox.delete(0, tk.END)
+        opponent_names = list(self.opponents_data.keys())
         
-        if self.opponents_data:
-            # Обновяване на комбо бокса за мач
-            opponent_names = list(self.opponents_data.keys())
+        # Обновяване на комбо бокса за мач
+        if opponent_names and self._tab_built(self.TAB_MATCH):
             self.match_opponent_combo['values'] = opponent_names
-            
-            # Обновяване на листбокса
-            for name in opponent_names:
-                win_prob = self.opponents_data[name].get('win_probability', 50)
-                display_name = f"{name} ({win_prob:.1f}%)"
-                self.opponents_listbox.insert(tk.END, display_name)
+        
+        if not self._tab_built(self.TAB_OPPONENTS):
+            return
+        
+        tree = self.opponents_tree
+        
+        # Премахваме само редовете на противници, които вече ги няма
+        for iid in tree.get_children():
+            if iid not in self.opponents_data:
+                tree.delete(iid)
+        
+        # Обновяване на дървото - съществуващите редове се променят, новите се добавят
+        for name in opponent_names:
+            win_prob = self.opponents_data[name].get('win_probability', 50)
+            display_name = f"{name} ({win_prob:.1f}%)"
+            if tree.exists(name):
+                tree.item(name, text=display_name)
+            else:
+                tree.insert('', 'end', iid=name, text=display_name)
+    
+    def _mark_opponents_dirty(self, name: Optional[str] = None):
+        """Отбелязва противник (или целия списък при name=None) за обновяване в интерфейса"""
+        with self._ui_lock:
+            if name is None:
+                self._ui_dirty = True
+            else:
+                self._ui_new_opponents.append(name)
+        self._schedule_ui()
+    
+    def _schedule_ui(self):
+        """Насрочва едно общо обновяване, независимо колко промени са натрупани"""
+        with self._ui_lock:
+            if self._ui_after_id is None and not self._closing:
+                try:
+                    self._ui_after_id = self.root.after(self.UI_REFRESH_MS, self._flush_ui)
+                except (tk.TclError, RuntimeError):
+                    pass
+    
+    def _flush_ui(self):
+        """Прилага натрупаните обновявания на списъка с противници"""
+        with self._ui_lock:
+            self._ui_after_id = None
+            full_refresh, self._ui_dirty = self._ui_dirty, False
+            new_opponents, self._ui_new_opponents = self._ui_new_opponents, []
+        
+        if full_refresh:
+            self.update_opponents_list()
+        else:
+            for name in dict.fromkeys(new_opponents):
+                self._append_opponent(name)
+    
+    def _append_opponent(self, name: str):
+        """Добавя (или обновява) един противник в списъка и в комбо бокса за мач"""
+        if self._tab_built(self.TAB_MATCH):
+            values = self.match_opponent_combo['values']
+            if name not in values:
+                self.match_opponent_combo['values'] = (*values, name)
+        
+        if not self._tab_built(self.TAB_OPPONENTS):
+            return
+        
+        tree = self.opponents_tree
+        win_prob = self.opponents_data[name].get('win_probability', 50)
+        display_name = f"{name} ({win_prob:.1f}%)"
+        if tree.exists(name):
+            tree.item(name, text=display_name)
+        else:
+            tree.insert('', 'end', iid=name, text=display_name)
     
     def on_opponent_select(self, event):
         """Handler за избор на противник"""
-        selection = self.opponents_listbox.curselection()
+        selection = self.opponents_tree.selection()
         if selection:
-            index = selection[0]
-            opponent_names = list(self.opponents_data.keys())
-            
-            if index < len(opponent_names):
-                opponent_name = opponent_names[index]
-                self.display_opponent_details(opponent_name)
+            self.display_opponent_details(selection[0])
+    
+    @staticmethod
+    def _bullet_list(items) -> str:
+        """Форматира елементите като редове с водещ символ '• '"""
+        return '\n'.join(['• ' + item for item in items])
     
     def display_opponent_details(self, opponent_name: str):
         """Показва детайли за противника"""
-        if opponent_name not in self.opponents_data:
+        if opponent_name not in self.opponents_data or not self._tab_built(self.TAB_OPPONENTS):
             return
         
-        opponent = self.opponents_data[opponent_name]
+        # Текстът се форматира наново само след промяна в opponents_data
+        cached = self._opp_details_cache.get(opponent_name)
+        if cached is not None and cached[0] == self._opp_version:
+            details = cached[1]
+        else:
+            details = self._format_opponent_details(opponent_name, self.opponents_data[opponent_name])
+            self._opp_details_cache[opponent_name] = (self._opp_version, details)
         
-        details = f"""
+        self._replace_text(self.opponent_details_text, details)
+    
+    def _format_opponent_details(self, opponent_name: str, opponent: Dict) -> str:
+        """Форматира детайлния анализ на противник"""
+        return f"""
 🎯 ДЕТАЙЛЕН АНАЛИЗ: {opponent_name}
 {'='*60}
 
@@ -1553,10 +2400,10 @@ class HockeyArenaGUI:
 • Тактическа тенденция: {opponent.get('tactical_tendency', 'Unknown')}
 
 💪 СИЛНИ СТРАНИ:
-{chr(10).join('• ' + s for s in opponent.get('strengths', ['Няма данни']))}
+{self._bullet_list(opponent.get('strengths', ['Няма данни']))}
 
 ⚠️ СЛАБОСТИ:
-{chr(10).join('• ' + w for w in opponent.get('weaknesses', ['Няма данни']))}
+{self._bullet_list(opponent.get('weaknesses', ['Няма данни']))}
 
 🎯 ПРЕПОРЪЧИТЕЛНИ ТАКТИКИ:
 • Формация: {opponent.get('recommended_tactics', {}).get('recommended_formation', 'Unknown')}
@@ -1564,7 +2411,7 @@ class HockeyArenaGUI:
 • Специализация: {opponent.get('recommended_tactics', {}).get('specialization', 'Unknown')}
 
 📋 ИНСТРУКЦИИ ЗА МАЧА:
-{chr(10).join('• ' + i for i in opponent.get('match_instructions', ['Няма инструкции']))}
+{self._bullet_list(opponent.get('match_instructions', ['Няма инструкции']))}
 
 💡 AI ПРЕПОРЪКИ:
 • Използвайте тяхните слабости в ваша полза
@@ -1572,9 +2419,6 @@ class HockeyArenaGUI:
 • Адаптирайте тактиката според анализа
 • Следете енергията на играчите
 """
-        
-        self.opponent_details_text.delete(1.0, tk.END)
-        self.opponent_details_text.insert(tk.END, details)
     
     def analyze_specific_opponent(self):
         """Анализира конкретен противник"""
@@ -1594,19 +2438,18 @@ class HockeyArenaGUI:
                 analysis = self.analyzer.analyze_specific_opponent(opponent_name)
                 
                 if analysis:
-                    self.opponents_data[opponent_name] = analysis
-                    self.root.after(0, self.update_opponents_list)
-                    self.root.after(0, lambda: self.display_opponent_details(opponent_name))
-                    self.root.after(0, lambda: messagebox.showinfo("Успех", f"✅ {opponent_name} е анализиран успешно!"))
+                    self._store_opponent(opponent_name, analysis)
+                    self._mark_opponents_dirty(opponent_name)
+                    self._call_ui(lambda: self.display_opponent_details(opponent_name))
+                    self._call_ui(lambda: messagebox.showinfo("Успех", f"✅ {opponent_name} е анализиран успешно!"))
                 else:
-                    self.root.after(0, lambda: messagebox.showerror("Грешка", f"❌ Неуспешен анализ на {opponent_name}"))
+                    self._call_ui(lambda: messagebox.showerror("Грешка", f"❌ Неуспешен анализ на {opponent_name}"))
                     
             except Exception as e:
                 error_msg = str(e)
-                self.root.after(0, lambda: messagebox.showerror("Грешка", f"❌ Грешка: {error_msg}"))
+                self._call_ui(lambda: messagebox.showerror("Грешка", f"❌ Грешка: {error_msg}"))
         
-        thread = threading.Thread(target=analyze, daemon=True)
-        thread.start()
+        self._run_in_background(analyze)
     
     def analyze_all_league_opponents(self):
         """Анализира всички противници от лигата"""
@@ -1619,27 +2462,26 @@ class HockeyArenaGUI:
                 self.update_status("🔍 Откриване на всички противници в лигата...")
                 all_opponents = self.analyzer.discover_all_league_opponents()
                 
+                # Заявките за отделните противници се припокриват (виж OpponentIntelligence.analyze_opponents)
                 total = len(all_opponents)
-                for i, opponent in enumerate(all_opponents, 1):
-                    self.update_status(f"🎯 Анализиране {i}/{total}: {opponent}")
-                    
-                    analysis = self.analyzer.analyze_specific_opponent(opponent)
+                
+                def on_result(i: int, opponent: str, analysis: Dict):
+                    self.update_status(f"🎯 Анализиран {i}/{total}: {opponent}")
                     if analysis:
-                        self.opponents_data[opponent] = analysis
-                    
-                    # Обновяваме GUI периодично
-                    if i % 3 == 0:
-                        self.root.after(0, self.update_opponents_list)
+                        self._store_opponent(opponent, analysis)
+                        # Добавяме само новия ред вместо пълно обновяване на списъка
+                        self._mark_opponents_dirty(opponent)
+                
+                self.analyzer.opponent_intelligence.analyze_opponents(all_opponents, on_result=on_result)
                 
-                self.root.after(0, self.update_opponents_list)
-                self.root.after(0, lambda: messagebox.showinfo("Успех", f"✅ Анализирани {len(self.opponents_data)} противника!"))
+                self._mark_opponents_dirty()
+                self._call_ui(lambda: messagebox.showinfo("Успех", f"✅ Анализирани {len(self.opponents_data)} противника!"))
                 
             except Exception as e:
                 error_msg = str(e)
-                self.root.after(0, lambda: messagebox.showerror("Грешка", f"❌ Грешка: {error_msg}"))
+                self._call_ui(lambda: messagebox.showerror("Грешка", f"❌ Грешка: {error_msg}"))
         
-        thread = threading.Thread(target=analyze_all, daemon=True)
-        thread.start()
+        self._run_in_background(analyze_all)
     
     def optimize_tactics(self):
         """Оптимизира тактиките"""
@@ -1650,6 +2492,7 @@ class HockeyArenaGUI:
         try:
             formation = self.formation_var.get()
             specialization = self.specialization_var.get()
+            spec_name, spec_description = _SPEC_CACHE.get(specialization, (specialization, 'Няма описание'))
             
             # Генерираме оптимизирани тактики
             optimized = self.analyzer.optimize_tactics_for_formation(formation, specialization)
@@ -1660,16 +2503,16 @@ class HockeyArenaGUI:
 
 🏒 ИЗБРАНА НАСТРОЙКА:
 • Формация: {formation}
-• Специализация: {TACTICAL_SPECIALIZATIONS.get(specialization, {}).get('name', specialization)}
+• Специализация: {spec_name}
 
 📋 ОПИСАНИЕ НА СПЕЦИАЛИЗАЦИЯТА:
-{TACTICAL_SPECIALIZATIONS.get(specialization, {}).get('description', 'Няма описание')}
+{spec_description}
 
 👥 ОПТИМАЛЕН СЪСТАВ:
 {optimized.get('lineup_details', 'Генериране...')}
 
 💡 ТАКТИЧЕСКИ СЪВЕТИ:
-{chr(10).join('• ' + tip for tip in optimized.get('tactical_tips', ['Няма съвети']))}
+{self._bullet_list(optimized.get('tactical_tips', ['Няма съвети']))}
 
 ⚠️ ВАЖНИ БЕЛЕЖКИ:
 • Следете енергията на играчите
@@ -1681,8 +2524,7 @@ class HockeyArenaGUI:
 {optimized.get('rotation_plan', 'Генериране на план...')}
 """
             
-            self.tactics_text.delete(1.0, tk.END)
-            self.tactics_text.insert(tk.END, tactics_content)
+            self._replace_text(self.tactics_text, tactics_content)
             
         except Exception as e:
             logger.error(f"Tactics optimization error: {e}")
@@ -1715,10 +2557,10 @@ class HockeyArenaGUI:
 • Вероятност за победа: {opponent.get('win_probability', 50):.1f}%
 
 💪 ТЕХНИ СИЛНИ СТРАНИ:
-{chr(10).join('• ' + s for s in opponent.get('strengths', []))}
+{self._bullet_list(opponent.get('strengths', []))}
 
 ⚠️ ТЕХНИ СЛАБОСТИ:
-{chr(10).join('• ' + w for w in opponent.get('weaknesses', []))}
+{self._bullet_list(opponent.get('weaknesses', []))}
 
 ⚡ НАША ТАКТИКА:
 • Формация: {opponent.get('recommended_tactics', {}).get('recommended_formation', 'Unknown')}
@@ -1726,7 +2568,7 @@ class HockeyArenaGUI:
 • Фокус: {opponent.get('recommended_tactics', {}).get('focus', 'Unknown')}
 
 📋 ИНСТРУКЦИИ ЗА МАЧА:
-{chr(10).join('• ' + i for i in opponent.get('match_instructions', []))}
+{self._bullet_list(opponent.get('match_instructions', []))}
 
 👥 СЪСТАВ И РОТАЦИЯ:
 • Основен състав: Най-добрите играчи според анализа
@@ -1775,8 +2617,7 @@ class HockeyArenaGUI:
 • Подгответе се за следващия противник
 """
             
-            self.match_plan_text.delete(1.0, tk.END)
-            self.match_plan_text.insert(tk.END, match_plan)
+            self._replace_text(self.match_plan_text, match_plan)
             
             messagebox.showinfo("Успех", f"✅ Планът за мач срещу {opponent_name} е готов!")
             
@@ -1831,6 +2672,7 @@ class HockeyArenaGUI:
         
         next_opponent = self.analyzer.get_next_opponent()
         if next_opponent:
+            self._ensure_tab(self.TAB_OPPONENTS)
             self.opponent_entry.delete(0, tk.END)
             self.opponent_entry.insert(0, next_opponent)
             self.analyze_specific_opponent()
@@ -1849,30 +2691,47 @@ class HockeyArenaGUI:
         except Exception as e:
             messagebox.showerror("Грешка", f"❌ Грешка при експорт: {str(e)}")
     
+    @staticmethod
+    def _read_log_tail(path: str, max_bytes: int) -> str:
+        """Прочита само последните max_bytes байта от лог файла (без първия непълен ред)"""
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - max_bytes))
+            tail = f.read()
+        
+        if size > max_bytes:
+            # Изрязваме реда, от който е прочетена само част
+            newline = tail.find(b'\n')
+            if newline != -1:
+                tail = tail[newline + 1:]
+        
+        return tail.decode('utf-8', errors='replace')
+    
     def refresh_logs(self):
         """Обновява логовете"""
         try:
-            self.logs_text.delete(1.0, tk.END)
+            parts = []
             
             # Зареждаме debug логовете
             try:
-                with open('hockey_arena_debug.log', 'r', encoding='utf-8') as f:
-                    debug_logs = f.read()
-                self.logs_text.insert(tk.END, "=== DEBUG LOGS ===\n")
-                self.logs_text.insert(tk.END, debug_logs[-5000:])  # Последните 5000 символа
+                debug_logs = self._read_log_tail('hockey_arena_debug.log', 8192)
+                parts.append("=== DEBUG LOGS ===\n")
+                parts.append(debug_logs)
             except FileNotFoundError:
-                self.logs_text.insert(tk.END, "Debug log file not found.\n")
+                parts.append("Debug log file not found.\n")
             
             # Зареждаме error логовете
             try:
-                with open('hockey_arena_errors.log', 'r', encoding='utf-8') as f:
-                    error_logs = f.read()
+                error_logs = self._read_log_tail('hockey_arena_errors.log', 4096)
                 if error_logs.strip():
-                    self.logs_text.insert(tk.END, "\n\n=== ERROR LOGS ===\n")
-                    self.logs_text.insert(tk.END, error_logs[-3000:])  # Последните 3000 символа
+                    parts.append("\n\n=== ERROR LOGS ===\n")
+                    parts.append(error_logs)
             except FileNotFoundError:
                 pass
             
+            # Пренаписват се само редовете след общото начало със стария текст
+            self._replace_text(self.logs_text, ''.join(parts))
+            
             # Скролиране до края
             self.logs_text.see(tk.END)
             
@@ -1915,40 +2774,51 @@ class HockeyArenaGUI:
             messagebox.showinfo("Debug Mode", "🐛 Debug режимът е включен")
     
     def update_delay_label(self, value):
-        """Обновява етикета за delay"""
-        self.delay_value_label.configure(text=f"{float(value):.1f}s")
+        """Обновява етикета за delay (веднъж на idle тик при влачене на плъзгача)"""
+        self._delay_new_value = float(value)
+        if not self._delay_pending:
+            self._delay_pending = True
+            self.root.after_idle(self._flush_delay_label)
+    
+    def _flush_delay_label(self):
+        """Записва последната стойност на delay в етикета"""
+        self._delay_pending = False
+        self.delay_value_label.configure(text=f"{self._delay_new_value:.1f}s")
     
     def open_work_directory(self):
         """Отваря работната директория"""
         try:
+            work_dir = os.getcwd()
             if sys.platform == "win32":
-                os.startfile(os.getcwd())
-            elif sys.platform == "darwin":
-                os.system(f"open {os.getcwd()}")
+                os.startfile(work_dir)
             else:
-                os.system(f"xdg-open {os.getcwd()}")
+                # Директно стартиране без shell - пътят не се интерпретира
+                opener = "open" if sys.platform == "darwin" else "xdg-open"
+                subprocess.Popen([opener, work_dir], start_new_session=True)
         except Exception as e:
             messagebox.showerror("Грешка", f"❌ Грешка при отваряне: {str(e)}")
     
     def clean_old_files(self):
         """Изчиства стари файлове"""
         try:
-            import glob
+            from fnmatch import fnmatchcase
             
             patterns = ['hockey_arena_*.json', 'hockey_arena_*.txt', '*.html', '*.csv']
             deleted_count = 0
             
-            for pattern in patterns:
-                files = glob.glob(pattern)
-                
-                # Изтриваме файлове по-стари от 7 дни
-                for file in files:
+            # Изтриваме файлове по-стари от 7 дни - едно минаване през директорията,
+            # stat() на DirEntry се кешира
+            cutoff = time.time() - 7 * 24 * 3600
+            with os.scandir('.') as entries:
+                for entry in entries:
+                    # Като glob - скритите файлове не се пипат
+                    if entry.name.startswith('.') or not any(fnmatchcase(entry.name, p) for p in patterns):
+                        continue
                     try:
-                        file_time = os.path.getmtime(file)
-                        if time.time() - file_time > 7 * 24 * 3600:  # 7 дни
-                            os.remove(file)
+                        if entry.is_file() and entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
                             deleted_count += 1
-                    except:
+                    except OSError:
                         continue
             
             messagebox.showinfo("Почистване", f"✅ Изтрити {deleted_count} стари файла")
@@ -1968,8 +2838,13 @@ class HockeyArenaGUI:
         }
         
         try:
-            with open('ha_master_settings.json', 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2)
+            data = json.dumps(settings, indent=2)
+            
+            # Файлът се пренаписва само при промяна - през временен файл, за да не остане наполовина записан
+            if data != self._settings_saved or not os.path.exists('ha_master_settings.json'):
+                _write_text_atomic('ha_master_settings.json', data)
+                self._settings_saved = data
+            
             messagebox.showinfo("Успех", "✅ Настройките са запазени!")
         except Exception as e:
             messagebox.showerror("Грешка", f"❌ Грешка при запазване: {str(e)}")
@@ -1978,7 +2853,9 @@ class HockeyArenaGUI:
         """Зарежда настройките"""
         try:
             with open('ha_master_settings.json', 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+                data = f.read()
+            settings = json.loads(data)
+            self._settings_saved = data
             
             self.human_behavior_var.set(settings.get('human_behavior', True))
             self.auto_opponent_var.set(settings.get('auto_opponent', True))
@@ -2005,6 +2882,20 @@ class HockeyArenaGUI:
         except Exception as e:
             logger.error(f"GUI error: {e}")
             messagebox.showerror("Критична грешка", f"❌ Неочаквана грешка: {str(e)}")
+        
+        # Прекъсваме чакащите delay-и, за да не продължава анализът след затваряне
+        self._closing = True
+        if self.analyzer:
+            self.analyzer.human_behavior.cancel()
+        self.guide_analyzer.cancel()
+        
+        # Отказваме задачите, които още чакат в опашката
+        while True:
+            try:
+                future, _, _ = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
 
 # ==================== MAIN AI SYSTEM CLASS ====================
 
@@ -2027,11 +2918,31 @@ class HockeyArenaMasterAI:
         self.our_players = []
         self.opponents_data = {}
         self.team_info = {}
+        
+        # Колоните на ростера за статистиките (виж _roster_columns)
+        self._roster_source = None
+        self._roster_cache = ((), (), {}, {})
+        
+        # Версия на данните за отбора и кеш на готовите отчети (виж _versioned)
+        self._players_version = 0
+        self._report_cache = {}
+        
+        # Готовите блокове за противниците в отчета: име -> (анализ, текст)
+        self._opponent_blocks = {}
         self.tactical_recommendations = {}
         
         # Настройка на сесията
         self.session.headers.update(self.browser_sim.get_brave_headers())
         
+        # Keep-alive pool, достатъчен за паралелния анализ на противници, и повторение при временни грешки
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
         logger.info("🏒 Hockey Arena Master AI initialized")
     
     def login_with_human_behavior(self) -> bool:
@@ -2060,8 +2971,8 @@ class HockeyArenaMasterAI:
             if login_response.status_code != 200:
                 raise Exception(f"Login page failed: {login_response.status_code}")
             
-            # Парсване на формата
-            soup = BeautifulSoup(login_response.content, 'html.parser')
+            # Парсване на формата - строи се дърво само за <form> елементите, не за цялата страница
+            soup = BeautifulSoup(login_response.content, HTML_PARSER, parse_only=SoupStrainer('form'))
             form = soup.find('form')
             
             if not form:
@@ -2111,6 +3022,23 @@ class HockeyArenaMasterAI:
             logger.error(f"Login failed: {e}")
             return False
     
+    @staticmethod
+    def _soup(content: bytes, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Парсва страница с най-бързия наличен парсер (байтовете - за да се определи кодировката от документа)"""
+        return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
+    
+    @staticmethod
+    def _save_debug_page(filename: str, content: bytes):
+        """Записва страница за debug във фонова нишка (суровите байтове - без декодиране)"""
+        def write():
+            try:
+                with open(filename, 'wb') as f:
+                    f.write(content)
+            except Exception as e:
+                logger.warning(f"Failed to save {filename}: {e}")
+        
+        threading.Thread(target=write, name="ha-debug-save", daemon=True).start()
+    
     def analyze_our_team(self):
         """Анализира нашия отбор"""
         logger.info("👥 Analyzing our team...")
@@ -2121,22 +3049,24 @@ class HockeyArenaMasterAI:
             self.human_behavior.realistic_delay(3.0, 6.0)
             
             response = self.session.get(players_url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._soup(response.content, _TABLES_ONLY)
             
             # Запазваме HTML за debug
             with open('our_players_analysis.html', 'w', encoding='utf-8') as f:
                 f.write(response.text)
             
             self.our_players = self._extract_our_players(soup)
+            self._players_version += 1
             
             # Анализ на информацията за отбора
             info_url = f"{self.base_url}/manager_summary.php"
             self.human_behavior.realistic_delay(2.0, 4.0)
             
             info_response = self.session.get(info_url, timeout=15)
-            info_soup = BeautifulSoup(info_response.content, 'html.parser')
+            info_soup = self._soup(info_response.content)
             
             self.team_info = self._extract_team_info(info_soup)
+            self._players_version += 1
             
             logger.info(f"✅ Team analysis complete: {len(self.our_players)} players analyzed")
             
@@ -2147,6 +3077,10 @@ class HockeyArenaMasterAI:
         """Извлича данните за нашите играчи"""
         players = []
         
+        # Методите от вътрешните цикли - в локални имена
+        players_append = players.append
+        digits_search = _RE_DIGITS.search
+        
         tables = soup.find_all('table')
         
         for table_idx, table in enumerate(tables):
@@ -2159,14 +3093,17 @@ class HockeyArenaMasterAI:
             header_row = rows[0]
             headers = [th.get_text().strip().lower() for th in header_row.find_all(['th', 'td'])]
             
-            # Проверяваме дали това е таблица с играчи
-            player_indicators = ['име', 'name', 'goa', 'def', 'att', 'sho', 'spe', 'str', 'pas', 'възраст', 'age']
-            
-            if not any(indicator in ' '.join(headers) for indicator in player_indicators):
+            # Проверяваме дали това е таблица с играчи - първо точно съвпадение на заглавие,
+            # после търсене като подниз (напр. 'goalie', 'player name')
+            if (_PLAYER_INDICATORS.isdisjoint(headers) and
+                    not any(indicator in header for header in headers for indicator in _PLAYER_INDICATORS)):
                 continue
             
             logger.debug(f"Found player table {table_idx + 1} with headers: {headers}")
             
+            # Видът на всяка колона се определя веднъж за таблицата
+            kinds = [self._classify_header(header) for header in headers]
+            
             # Извличаме данните за играчите
             for row_idx, row in enumerate(rows[1:], 1):
                 cells = row.find_all(['td', 'th'])
@@ -2179,38 +3116,24 @@ class HockeyArenaMasterAI:
                     'row_number': row_idx
                 }
                 
-                # Мапваме данните
-                for col_idx, cell in enumerate(cells):
-                    if col_idx < len(headers):
-                        cell_text = cell.get_text().strip()
-                        
-                        if cell_text and cell_text not in ['-', '', '0']:
-                            # Специална обработка за различни типове данни
-                            header = headers[col_idx]
-                            
-                            if any(attr in header for attr in ['goa', 'def', 'att', 'sho', 'spe', 'str', 'pas']):
-                                # Атрибути - извличаме числото
-                                numbers = re.findall(r'\d+', cell_text)
-                                if numbers:
-                                    player_data[header] = int(numbers[0])
-                            elif 'възраст' in header or 'age' in header:
-                                # Възраст
-                                age_match = re.search(r'\d+', cell_text)
-                                if age_match:
-                                    player_data['age'] = int(age_match.group())
-                            elif 'форма' in header or 'form' in header:
-                                # Форма
-                                form_match = re.search(r'\d+', cell_text)
-                                if form_match:
-                                    player_data['form'] = int(form_match.group())
-                            elif 'енергия' in header or 'energy' in header:
-                                # Енергия
-                                energy_match = re.search(r'\d+', cell_text)
-                                if energy_match:
-                                    player_data['energy'] = int(energy_match.group())
-                            else:
-                                # Останали полета като текст
-                                player_data[header] = cell_text
+                # Мапваме данните (клетките без заглавие се пропускат от zip)
+                for cell, header, kind in zip(cells, headers, kinds):
+                    # Обикновено клетката е само текст - тогава .string е готов без обхождане на дървото
+                    cell_text = cell.string
+                    if type(cell_text) is not NavigableString:
+                        cell_text = cell.get_text()
+                    cell_text = cell_text.strip()
+                    
+                    if cell_text and cell_text not in ('-', '0'):
+                        # Специална обработка за различни типове данни
+                        if kind == 'text':
+                            # Останали полета като текст
+                            player_data[header] = cell_text
+                        else:
+                            # Атрибути (под заглавието си), възраст, форма, енергия - извличаме числото
+                            number_match = digits_search(cell_text)
+                            if number_match:
+                                player_data[header if kind == 'attr' else kind] = int(number_match.group())
                 
                 # Обработваме играча само ако има достатъчно данни
                 if len(player_data) >= 5:
@@ -2221,16 +3144,26 @@ class HockeyArenaMasterAI:
                     player_data['ai_rating'] = self._calculate_ai_rating(player_data)
                     player_data['best_position'] = self._determine_best_position(player_data)
                     player_data['potential_assessment'] = self._assess_potential(player_data)
+                    player_data['rating_str'] = f"{player_data['ai_rating']:.1f}"  # готов за съставите и таблицата
                     
-                    players.append(player_data)
-                    logger.debug(f"Added player: {player_data['name']} (Rating: {player_data['ai_rating']:.1f})")
+                    players_append(player_data)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Added player: {player_data['name']} (Rating: {player_data['ai_rating']:.1f})")
         
         return players
     
+    @staticmethod
+    def _classify_header(header: str) -> str:
+        """Връща вида на колоната: 'attr', 'age', 'form', 'energy' или 'text'"""
+        for keys, kind in _HEADER_KINDS:
+            if any(key in header for key in keys):
+                return kind
+        return 'text'
+    
     def _extract_player_name(self, player_data: Dict) -> str:
-        """Извлича името на играча"""
+        """Извлича името на играча (ключовете са с малки букви - заглавията се нормализират при извличането)"""
         for key, value in player_data.items():
-            if 'име' in key.lower() or 'name' in key.lower():
+            if 'име' in key or 'name' in key:
                 return str(value)
         
         # Ако няма експлицитно име, търсим в данните
@@ -2244,29 +3177,26 @@ class HockeyArenaMasterAI:
         """Изчислява AI рейтинг на играч според официалното ръководство"""
         attributes = {}
         
-        # Извличаме основните атрибути
-        attr_mapping = {
-            'goa': ['goa', 'brána'],
-            'def': ['def', 'obrana', 'защита'],
-            'att': ['att', 'útok', 'атака'],
-            'sho': ['sho', 'streľba', 'стрелба'],
-            'pas': ['pas', 'nahrávka', 'подаване'],
-            'str': ['str', 'sila', 'сила'],
-            'spe': ['spe', 'rýchlosť', 'скорост'],
-            'dis': ['dis', 'sebaovládanie', 'дисциплина']
-        }
-        
-        for attr, variations in attr_mapping.items():
-            for key, value in player_data.items():
-                if any(var in key.lower() for var in variations):
-                    if isinstance(value, int):
-                        attributes[attr] = value
-                        break
-                    elif isinstance(value, str):
-                        numbers = re.findall(r'\d+', value)
-                        if numbers:
-                            attributes[attr] = int(numbers[0])
-                            break
+        # Извличаме основните атрибути - едно минаване през ключовете (вече с малки букви);
+        # всеки атрибут взима първия подходящ ключ с числова стойност
+        for key, value in player_data.items():
+            matched = [attr for attr, variations in _ATTR_VARIATIONS
+                       if attr not in attributes and any(var in key for var in variations)]
+            if not matched:
+                continue
+            
+            if isinstance(value, int):
+                number = value
+            elif isinstance(value, str):
+                number_match = _RE_DIGITS.search(value)
+                if not number_match:
+                    continue
+                number = int(number_match.group())
+            else:
+                continue
+            
+            for attr in matched:
+                attributes[attr] = number
         
         if not attributes:
             return 0.0
@@ -2295,10 +3225,10 @@ class HockeyArenaMasterAI:
         """Определя най-добрата позиция според официалното ръководство"""
         attributes = {}
         
-        # Извличаме атрибутите
+        # Извличаме атрибутите (ключовете вече са с малки букви)
         for key, value in player_data.items():
-            if isinstance(value, int) and any(attr in key.lower() for attr in ['goa', 'def', 'att', 'sho', 'pas', 'str', 'spe']):
-                attr_name = key.lower()
+            if isinstance(value, int) and any(attr in key for attr in ['goa', 'def', 'att', 'sho', 'pas', 'str', 'spe']):
+                attr_name = key
                 if 'goa' in attr_name:
                     attributes['goa'] = value
                 elif 'def' in attr_name:
@@ -2318,62 +3248,44 @@ class HockeyArenaMasterAI:
             return 'Unknown'
         
         # Изчисляваме рейтинги за всяка позиция според ръководството
-        position_ratings = {}
+        goa = attributes.get('goa', 0)
+        dfn = attributes.get('def', 0)
+        att = attributes.get('att', 0)
+        sho = attributes.get('sho', 0)
+        pas = attributes.get('pas', 0)
+        stg = attributes.get('str', 0)
+        spe = attributes.get('spe', 0)
+        
+        # Защитник: Obrana (главен) + Sila + останали
+        w = _W_DEF
+        best_name, best_val = 'Defender', dfn * w[0] + stg * w[1] + spe * w[2] + pas * w[3] + att * w[4]
         
         # Вратар: Brána (главен) + Rýchlosť + Nahrávka за контрол на шайбата
+        # (при равенство вратарят има предимство, както при подредбата досега)
         if 'goa' in attributes:
-            gk_rating = (attributes.get('goa', 0) * 0.6 + 
-                        attributes.get('spe', 0) * 0.3 + 
-                        attributes.get('pas', 0) * 0.1)
-            position_ratings['Goalkeeper'] = gk_rating
-        
-        # Защитник: Obrana (главен) + Sila + останали
-        def_rating = (attributes.get('def', 0) * 0.4 +
-                     attributes.get('str', 0) * 0.25 +
-                     attributes.get('spe', 0) * 0.15 +
-                     attributes.get('pas', 0) * 0.1 +
-                     attributes.get('att', 0) * 0.1)
-        position_ratings['Defender'] = def_rating
+            w = _W_GK
+            gk = goa * w[0] + spe * w[1] + pas * w[2]
+            if gk >= best_val:
+                best_name, best_val = 'Goalkeeper', gk
         
         # Център: Nahrávka (важна) + Útok + Sila (за вхвърляния)
-        center_rating = (attributes.get('pas', 0) * 0.3 +
-                        attributes.get('att', 0) * 0.25 +
-                        attributes.get('str', 0) * 0.2 +
-                        attributes.get('spe', 0) * 0.15 +
-                        attributes.get('sho', 0) * 0.1)
-        position_ratings['Center'] = center_rating
+        w = _W_CEN
+        cen = pas * w[0] + att * w[1] + stg * w[2] + spe * w[3] + sho * w[4]
+        if cen > best_val:
+            best_name, best_val = 'Center', cen
         
         # Нападател: Útok + Streľba (главни)
-        forward_rating = (attributes.get('att', 0) * 0.3 +
-                         attributes.get('sho', 0) * 0.3 +
-                         attributes.get('spe', 0) * 0.2 +
-                         attributes.get('pas', 0) * 0.15 +
-                         attributes.get('str', 0) * 0.05)
-        position_ratings['Forward'] = forward_rating
+        w = _W_FWD
+        fwd = att * w[0] + sho * w[1] + spe * w[2] + pas * w[3] + stg * w[4]
+        if fwd > best_val:
+            best_name = 'Forward'
         
-        # Връщаме позицията с най-висок рейтинг
-        if position_ratings:
-            best_position = max(position_ratings, key=position_ratings.get)
-            return best_position
-        
-        return 'Unknown'
+        return best_name
     
     def _assess_potential(self, player_data: Dict) -> str:
         """Оценява потенциала на играча"""
         age = player_data.get('age', 25)
-        
-        if age < 20:
-            return 'Very High'
-        elif age < 23:
-            return 'High' 
-        elif age < 27:
-            return 'Good'
-        elif age < 30:
-            return 'Medium'
-        elif age < 33:
-            return 'Low'
-        else:
-            return 'Very Low'
+        return _POTENTIAL_BUCKETS[bisect.bisect_right(_POTENTIAL_CUTS, age)]
     
     def _extract_team_info(self, soup: BeautifulSoup) -> Dict:
         """Извлича информация за отбора"""
@@ -2383,16 +3295,8 @@ class HockeyArenaMasterAI:
         text = soup.get_text()
         
         # Извличаме различни данни
-        patterns = {
-            'team_name': r'Мено тіму[:\s]*([^\n]+)',
-            'league': r'Ліга[:\s]*([^\n]+)',
-            'money': r'Готовість[:\s]*([^\n]+)',
-            'players_count': r'Рочет граців[:\s]*([^\n]+)',
-            'fans': r'Фанклуб[:\s]*([^\n]+)'
-        }
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
+        for key, pattern in _TEAM_INFO_PATTERNS.items():
+            match = pattern.search(text)
             if match:
                 team_info[key] = match.group(1).strip()
         
@@ -2410,11 +3314,13 @@ class HockeyArenaMasterAI:
             self.human_behavior.realistic_delay(3.0, 6.0)
             
             response = self.session.get(standings_url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._soup(response.content, _TABLES_ONLY)
             
             # Запазваме за debug
-            with open('league_standings.html', 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            self._save_debug_page('league_standings.html', response.content)
+            
+            # Анализът на противниците ползва същото класиране
+            self.opponent_intelligence.set_standings(soup)
             
             # Извличаме имената на отборите
             opponent_names = self._extract_opponent_names_from_standings(soup)
@@ -2422,25 +3328,28 @@ class HockeyArenaMasterAI:
             logger.info(f"Found {len(opponent_names)} opponents in league")
             
             # Анализираме топ противници (ограничаваме за време)
-            for i, opponent_name in enumerate(opponent_names[:8], 1):  # Топ 8
-                logger.info(f"🎯 Analyzing opponent {i}/8: {opponent_name}")
-                
-                # Реалистична пауза между анализи
-                self.human_behavior.realistic_delay(4.0, 8.0)
-                
-                try:
-                    analysis = self.opponent_intelligence.analyze_opponent(opponent_name)
-                    if analysis and 'error' not in analysis:
-                        opponents[opponent_name] = analysis
-                        logger.debug(f"✅ {opponent_name} analyzed successfully")
-                    else:
-                        logger.warning(f"⚠️ Failed to analyze {opponent_name}")
-                        
-                except Exception as e:
-                    logger.error(f"Error analyzing {opponent_name}: {e}")
-                    continue
+            top_opponents = opponent_names[:8]  # Топ 8
+            
+            def on_result(i: int, opponent_name: str, analysis: Dict):
+                logger.info(f"🎯 Analyzed opponent {i}/{len(top_opponents)}: {opponent_name}")
+                if analysis and 'error' not in analysis:
+                    logger.debug(f"✅ {opponent_name} analyzed successfully")
+                else:
+                    logger.warning(f"⚠️ Failed to analyze {opponent_name}")
+            
+            # Реалистична пауза преди всеки некеширан анализ - всеки работник чака отделно;
+            # резултатите идват по реда от класирането
+            results = self.opponent_intelligence.analyze_opponents(
+                top_opponents,
+                delay=lambda: self.human_behavior.realistic_delay(4.0, 8.0),
+                on_result=on_result
+            )
+            opponents = {name: analysis for name, analysis in results.items()
+                         if analysis and 'error' not in analysis}
             
             self.opponents_data = opponents
+            self._opponent_blocks = {name: (analysis, self._format_opponent_block(name, analysis))
+                                     for name, analysis in opponents.items()}
             logger.info(f"✅ Opponent analysis complete: {len(opponents)} teams analyzed")
             
             return opponents
@@ -2452,6 +3361,8 @@ class HockeyArenaMasterAI:
     def _extract_opponent_names_from_standings(self, soup: BeautifulSoup) -> List[str]:
         """Извлича имената на противниците от класирането"""
         opponent_names = []
+        names_append = opponent_names.append
+        digits_only = _RE_DIGITS_ONLY.match
         
         tables = soup.find_all('table')
         
@@ -2463,7 +3374,8 @@ class HockeyArenaMasterAI:
                 continue
             
             for row in rows[1:]:  # Пропускаме header
-                cells = row.find_all(['td', 'th'])
+                # Трябват ни само първите две клетки - търсенето спира след тях
+                cells = row.find_all(['td', 'th'], limit=2)
                 
                 if len(cells) >= 2:
                     # Обикновено името на отбора е във втората колона
@@ -2473,10 +3385,10 @@ class HockeyArenaMasterAI:
                     # Филтрираме валидни имена
                     if (team_name and 
                         len(team_name) > 2 and 
-                        team_name not in ['Име на отбора', 'Team Name', 'Отбор'] and
-                        not re.match(r'^\d+, team_name)):  # Не само цифри
+                        team_name not in _SKIP_TEAM_HEADERS and
+                        not digits_only(team_name)):  # Не само цифри
                         
-                        opponent_names.append(team_name)
+                        names_append(team_name)
         
         # Премахваме дублиращи се и връщаме уникални
         unique_opponents = list(dict.fromkeys(opponent_names))  # Запазва реда
@@ -2537,8 +3449,25 @@ class HockeyArenaMasterAI:
         except Exception as e:
             logger.error(f"Tactical generation failed: {e}")
     
+    def _versioned(self, key: str, build):
+        """Връща кеширания резултат на build(), докато данните за отбора не се сменят.
+        
+        Всяко ново присвояване на our_players/team_info в analyze_our_team увеличава _players_version.
+        """
+        cached = self._report_cache.get(key)
+        if cached is not None and cached[0] == self._players_version:
+            return cached[1]
+        
+        value = build()
+        self._report_cache[key] = (self._players_version, value)
+        return value
+    
     def _analyze_our_team_strength(self) -> Dict:
         """Анализира силата на нашия отбор"""
+        return self._versioned('team_strength', self._build_team_strength)
+    
+    def _build_team_strength(self) -> Dict:
+        """Изчислява анализа за _analyze_our_team_strength"""
         if not self.our_players:
             return {}
         
@@ -2551,26 +3480,18 @@ class HockeyArenaMasterAI:
             'energy_analysis': {}
         }
         
+        ratings, _, positions, age_analysis = self._roster_columns()
+        
         # Основни статистики
-        ratings = [p.get('ai_rating', 0) for p in self.our_players if p.get('ai_rating')]
         if ratings:
             analysis['average_rating'] = sum(ratings) / len(ratings)
         
         # Разпределение по позиции
-        for player in self.our_players:
-            pos = player.get('best_position', 'Unknown')
-            analysis['position_distribution'][pos] = analysis['position_distribution'].get(pos, 0) + 1
+        analysis['position_distribution'] = dict(positions)
         
         # Възрастов анализ
-        ages = [p.get('age', 25) for p in self.our_players if p.get('age')]
-        if ages:
-            analysis['age_analysis'] = {
-                'average': sum(ages) / len(ages),
-                'min': min(ages),
-                'max': max(ages),
-                'young_players': len([a for a in ages if a < 23]),
-                'veteran_players': len([a for a in ages if a > 30])
-            }
+        if age_analysis:
+            analysis['age_analysis'] = dict(age_analysis)
         
         return analysis
     
@@ -2606,6 +3527,57 @@ class HockeyArenaMasterAI:
     
     # ==================== INTERFACE METHODS ====================
     
+    def _roster_columns(self):
+        """Връща рейтингите, възрастите, разпределението по позиции и възрастовия анализ,
+        натрупани с едно минаване през играчите.
+        
+        Пресмятат се наново само когато self.our_players е заменен (след analyze_our_team).
+        """
+        if self._roster_source is not self.our_players:
+            ratings = []
+            ages = []
+            positions = {}
+            ratings_append = ratings.append
+            ages_append = ages.append
+            age_sum = young = veterans = 0
+            age_min = age_max = None
+            
+            for player in self.our_players:
+                rating = player.get('ai_rating')
+                if rating:
+                    ratings_append(rating)
+                
+                age = player.get('age')
+                if age:
+                    ages_append(age)
+                    age_sum += age
+                    if age_min is None or age < age_min:
+                        age_min = age
+                    if age_max is None or age > age_max:
+                        age_max = age
+                    if age < 23:
+                        young += 1
+                    elif age > 30:
+                        veterans += 1
+                
+                pos = player.get('best_position', 'Unknown')
+                positions[pos] = positions.get(pos, 0) + 1
+            
+            age_analysis = {}
+            if ages:
+                age_analysis = {
+                    'average': age_sum / len(ages),
+                    'min': age_min,
+                    'max': age_max,
+                    'young_players': young,
+                    'veteran_players': veterans
+                }
+            
+            self._roster_cache = (tuple(ratings), tuple(ages), positions, age_analysis)
+            self._roster_source = self.our_players
+        
+        return self._roster_cache
+    
     def get_our_players(self) -> List[Dict]:
         """Връща нашите играчи"""
         return self.our_players
@@ -2615,7 +3587,7 @@ class HockeyArenaMasterAI:
         if not self.our_players:
             return 0.0
         
-        ratings = [p.get('ai_rating', 0) for p in self.our_players if p.get('ai_rating')]
+        ratings = self._roster_columns()[0]
         return sum(ratings) / len(ratings) if ratings else 0.0
     
     def get_next_opponent(self) -> str:
@@ -2636,99 +3608,95 @@ class HockeyArenaMasterAI:
         if not self.team_info:
             return "Няма данни за отбора"
         
-        summary = "🏒 ИНФОРМАЦИЯ ЗА ОТБОРА\n"
-        summary += "=" * 40 + "\n\n"
+        parts = ["🏒 ИНФОРМАЦИЯ ЗА ОТБОРА\n", "=" * 40 + "\n\n"]
         
         for key, value in self.team_info.items():
-            summary += f"• {key.replace('_', ' ').title()}: {value}\n"
+            parts.append(f"• {key.replace('_', ' ').title()}: {value}\n")
         
-        return summary
+        return "".join(parts)
     
     def get_detailed_team_stats(self) -> str:
         """Връща детайлни статистики за отбора"""
+        return self._versioned('detailed_stats', self._build_detailed_team_stats)
+    
+    def _build_detailed_team_stats(self) -> str:
+        """Съставя текста за get_detailed_team_stats"""
         if not self.our_players:
             return "Няма данни за играчи"
         
-        stats = "📊 ДЕТАЙЛНИ СТАТИСТИКИ\n"
-        stats += "=" * 40 + "\n\n"
+        parts = ["📊 ДЕТАЙЛНИ СТАТИСТИКИ\n", "=" * 40 + "\n\n"]
         
         # Основни статистики
         total_players = len(self.our_players)
-        ratings = [p.get('ai_rating', 0) for p in self.our_players if p.get('ai_rating')]
+        ratings, _, positions, age_analysis = self._roster_columns()
         avg_rating = sum(ratings) / len(ratings) if ratings else 0
         
-        stats += f"📈 ОБЩИ ПОКАЗАТЕЛИ:\n"
-        stats += f"• Общо играчи: {total_players}\n"
-        stats += f"• Среден рейтинг: {avg_rating:.1f}/100\n"
-        stats += f"• Най-висок рейтинг: {max(ratings) if ratings else 0:.1f}\n"
-        stats += f"• Най-нисък рейтинг: {min(ratings) if ratings else 0:.1f}\n\n"
+        parts.append(f"📈 ОБЩИ ПОКАЗАТЕЛИ:\n"
+                     f"• Общо играчи: {total_players}\n"
+                     f"• Среден рейтинг: {avg_rating:.1f}/100\n"
+                     f"• Най-висок рейтинг: {max(ratings) if ratings else 0:.1f}\n"
+                     f"• Най-нисък рейтинг: {min(ratings) if ratings else 0:.1f}\n\n")
         
         # Разпределение по позиции
-        positions = {}
-        for player in self.our_players:
-            pos = player.get('best_position', 'Unknown')
-            positions[pos] = positions.get(pos, 0) + 1
-        
-        stats += f"📍 РАЗПРЕДЕЛЕНИЕ ПО ПОЗИЦИИ:\n"
+        parts.append("📍 РАЗПРЕДЕЛЕНИЕ ПО ПОЗИЦИИ:\n")
         for pos, count in positions.items():
-            stats += f"• {pos}: {count} играчи\n"
-        stats += "\n"
+            parts.append(f"• {pos}: {count} играчи\n")
+        parts.append("\n")
         
         # Възрастов анализ
-        ages = [p.get('age', 25) for p in self.our_players if p.get('age')]
-        if ages:
-            avg_age = sum(ages) / len(ages)
-            stats += f"👥 ВЪЗРАСТОВ АНАЛИЗ:\n"
-            stats += f"• Средна възраст: {avg_age:.1f} години\n"
-            stats += f"• Най-млад: {min(ages)} години\n"
-            stats += f"• Най-възрастен: {max(ages)} години\n"
-            stats += f"• Млади играчи (<23): {len([a for a in ages if a < 23])}\n"
-            stats += f"• Ветерани (>30): {len([a for a in ages if a > 30])}\n\n"
-        
-        # Топ 5 играчи
-        top_players = sorted(self.our_players, key=lambda p: p.get('ai_rating', 0), reverse=True)[:5]
-        stats += f"🌟 ТОП 5 ИГРАЧИ:\n"
+        if age_analysis:
+            parts.append(f"👥 ВЪЗРАСТОВ АНАЛИЗ:\n"
+                         f"• Средна възраст: {age_analysis['average']:.1f} години\n"
+                         f"• Най-млад: {age_analysis['min']} години\n"
+                         f"• Най-възрастен: {age_analysis['max']} години\n"
+                         f"• Млади играчи (<23): {age_analysis['young_players']}\n"
+                         f"• Ветерани (>30): {age_analysis['veteran_players']}\n\n")
+        
+        # Топ 5 играчи (без пълно сортиране на състава); ai_rating/rating_str/name/best_position
+        # се задават на всеки играч в _extract_our_players
+        top_players = heapq.nlargest(5, self.our_players, key=lambda p: p['ai_rating'])
+        parts.append("🌟 ТОП 5 ИГРАЧИ:\n")
         for i, player in enumerate(top_players, 1):
-            name = player.get('name', 'Unknown')
-            rating = player.get('ai_rating', 0)
-            position = player.get('best_position', 'Unknown')
-            stats += f"{i}. {name} - {rating:.1f} ({position})\n"
+            parts.append(f"{i}. {player['name']} - {player['rating_str']} ({player['best_position']})\n")
         
-        return stats
+        return "".join(parts)
     
     def get_team_recommendations(self) -> str:
         """Връща препоръки за отбора"""
+        return self._versioned('recommendations', self._build_team_recommendations)
+    
+    def _build_team_recommendations(self) -> str:
+        """Съставя текста за get_team_recommendations"""
         if not self.our_players:
             return "Няма данни за генериране на препоръки"
         
-        recs = "💡 AI ПРЕПОРЪКИ ЗА ОТБОРА\n"
-        recs += "=" * 40 + "\n\n"
+        parts = ["💡 AI ПРЕПОРЪКИ ЗА ОТБОРА\n", "=" * 40 + "\n\n"]
         
         # Анализ и препоръки
         team_analysis = self._analyze_our_team_strength()
         avg_rating = team_analysis.get('average_rating', 0)
         
-        recs += "🎯 ПРИОРИТЕТНИ ПРЕПОРЪКИ:\n"
+        parts.append("🎯 ПРИОРИТЕТНИ ПРЕПОРЪКИ:\n")
         
         if avg_rating < 45:
-            recs += "• 🔴 КРИТИЧНО: Отборът се нуждае от спешни подобрения\n"
-            recs += "• 📈 Фокусирайте се върху тренировки на основните атрибути\n"
-            recs += "• 🔄 Търсете нови играчи на трансферния пазар\n"
+            parts.append("• 🔴 КРИТИЧНО: Отборът се нуждае от спешни подобрения\n"
+                         "• 📈 Фокусирайте се върху тренировки на основните атрибути\n"
+                         "• 🔄 Търсете нови играчи на трансферния пазар\n")
         elif avg_rating < 60:
-            recs += "• 🟡 Отборът има потенциал за подобрение\n"
-            recs += "• 🏋️ Интензивни тренировки за ключовите играчи\n"
-            recs += "• 🎯 Фокус върху слабите позиции\n"
+            parts.append("• 🟡 Отборът има потенциал за подобрение\n"
+                         "• 🏋️ Интензивни тренировки за ключовите играчи\n"
+                         "• 🎯 Фокус върху слабите позиции\n")
         else:
-            recs += "• 🟢 Силен отбор - поддържайте формата\n"
-            recs += "• ⭐ Инвестирайте в млади таланти\n"
-            recs += "• 🏆 Фокусирайте се върху тактическо усъвършенстване\n"
+            parts.append("• 🟢 Силен отбор - поддържайте формата\n"
+                         "• ⭐ Инвестирайте в млади таланти\n"
+                         "• 🏆 Фокусирайте се върху тактическо усъвършенстване\n")
         
-        recs += "\n"
+        parts.append("\n")
         
         # Позиционни препоръки
         positions = team_analysis.get('position_distribution', {})
         
-        recs += "📍 ПОЗИЦИОННИ ПРЕПОРЪКИ:\n"
+        parts.append("📍 ПОЗИЦИОННИ ПРЕПОРЪКИ:\n")
         
         position_needs = {
             'Goalkeeper': 2,
@@ -2740,39 +3708,39 @@ class HockeyArenaMasterAI:
         for pos, needed in position_needs.items():
             current = positions.get(pos, 0)
             if current < needed:
-                recs += f"• ⚠️ Нужни са {needed - current} {pos.lower()}(s)\n"
+                parts.append(f"• ⚠️ Нужни са {needed - current} {pos.lower()}(s)\n")
             elif current == needed:
-                recs += f"• ✅ Добро покритие на позиция {pos.lower()}\n"
+                parts.append(f"• ✅ Добро покритие на позиция {pos.lower()}\n")
             else:
-                recs += f"• 📊 Добра дълбочина на позиция {pos.lower()}\n"
+                parts.append(f"• 📊 Добра дълбочина на позиция {pos.lower()}\n")
         
-        recs += "\n"
+        parts.append("\n")
         
         # Възрастови препоръки
         age_analysis = team_analysis.get('age_analysis', {})
         avg_age = age_analysis.get('average', 25)
         
-        recs += "👥 ВЪЗРАСТОВИ ПРЕПОРЪКИ:\n"
+        parts.append("👥 ВЪЗРАСТОВИ ПРЕПОРЪКИ:\n")
         
         if avg_age > 29:
-            recs += "• 🔄 Отборът застарява - търсете млади играчи\n"
-            recs += "• 💪 Обърнете внимание на физическата подготовка\n"
+            parts.append("• 🔄 Отборът застарява - търсете млади играчи\n"
+                         "• 💪 Обърнете внимание на физическата подготовка\n")
         elif avg_age < 22:
-            recs += "• 🌱 Млад отбор - фокусирайте се върху развитието\n"
-            recs += "• 📚 Инвестирайте в тренировки и опит\n"
+            parts.append("• 🌱 Млад отбор - фокусирайте се върху развитието\n"
+                         "• 📚 Инвестирайте в тренировки и опит\n")
         else:
-            recs += "• ⚖️ Добър възрастов баланс\n"
-            recs += "• 🎯 Продължете с настоящата стратегия\n"
+            parts.append("• ⚖️ Добър възрастов баланс\n"
+                         "• 🎯 Продължете с настоящата стратегия\n")
         
         # Общи препоръки
-        recs += "\n🎮 ОБЩИ ПРЕПОРЪКИ:\n"
-        recs += "• 📊 Редовно анализирайте противниците\n"
-        recs += "• ⚡ Адаптирайте тактиките според мача\n"
-        recs += "• 💪 Следете енергията и формата на играчите\n"
-        recs += "• 🔄 Използвайте ротацията разумно\n"
-        recs += "• 📈 Инвестирайте в дългосрочно развитие\n"
+        parts.append("\n🎮 ОБЩИ ПРЕПОРЪКИ:\n"
+                     "• 📊 Редовно анализирайте противниците\n"
+                     "• ⚡ Адаптирайте тактиките според мача\n"
+                     "• 💪 Следете енергията и формата на играчите\n"
+                     "• 🔄 Използвайте ротацията разумно\n"
+                     "• 📈 Инвестирайте в дългосрочно развитие\n")
         
-        return recs
+        return "".join(parts)
     
     def analyze_specific_opponent(self, opponent_name: str) -> Dict:
         """Анализира конкретен противник"""
@@ -2783,7 +3751,8 @@ class HockeyArenaMasterAI:
         try:
             standings_url = f"{self.base_url}/public_standings.inc"
             response = self.session.get(standings_url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._soup(response.content, _TABLES_ONLY)
+            self.opponent_intelligence.set_standings(soup)
             
             return self._extract_opponent_names_from_standings(soup)
         except Exception as e:
@@ -2815,194 +3784,122 @@ class HockeyArenaMasterAI:
         if not self.our_players:
             return "Няма данни за играчи"
         
-        lineup = f"📋 ОПТИМАЛЕН СЪСТАВ ЗА ФОРМАЦИЯ {formation}:\n\n"
+        parts = [f"📋 ОПТИМАЛЕН СЪСТАВ ЗА ФОРМАЦИЯ {formation}:\n\n"]
         
         # Сортираме играчите по позиции и рейтинг
         goalkeepers = [p for p in self.our_players if p.get('best_position') == 'Goalkeeper']
         defenders = [p for p in self.our_players if p.get('best_position') == 'Defender']
-        centers = [p for p in self.our_players if p.get('best_position') == 'Center']
         forwards = [p for p in self.our_players if p.get('best_position') == 'Forward']
         
         # Сортираме по рейтинг
-        for position_list in [goalkeepers, defenders, centers, forwards]:
-            position_list.sort(key=lambda p: p.get('ai_rating', 0), reverse=True)
+        for position_list in [goalkeepers, defenders, forwards]:
+            position_list.sort(key=lambda p: p['ai_rating'], reverse=True)
         
         # Генерираме състава според формацията
-        if formation == '1-4-1':
-            lineup += "🥅 ВРАТАР:\n"
-            if goalkeepers:
-                gk = goalkeepers[0]
-                lineup += f"• {gk['name']} (Рейтинг: {gk.get('ai_rating', 0):.1f})\n\n"
-            
-            lineup += "🛡️ ЗАЩИТНИЦИ (4):\n"
-            for i, defender in enumerate(defenders[:4], 1):
-                lineup += f"{i}. {defender['name']} (Рейтинг: {defender.get('ai_rating', 0):.1f})\n"
-            
-            lineup += "\n⚡ НАПАДАТЕЛИ (1):\n"
-            if forwards:
-                fw = forwards[0]
-                lineup += f"• {fw['name']} (Рейтинг: {fw.get('ai_rating', 0):.1f})\n"
-        
-        elif formation == '1-3-2':
-            lineup += "🥅 ВРАТАР:\n"
-            if goalkeepers:
-                gk = goalkeepers[0]
-                lineup += f"• {gk['name']} (Рейтинг: {gk.get('ai_rating', 0):.1f})\n\n"
+        counts = _FORMATIONS.get(formation)
+        if counts:
+            n_def, n_fwd = counts
             
-            lineup += "🛡️ ЗАЩИТНИЦИ (3):\n"
-            for i, defender in enumerate(defenders[:3], 1):
-                lineup += f"{i}. {defender['name']} (Рейтинг: {defender.get('ai_rating', 0):.1f})\n"
-            
-            lineup += "\n⚡ НАПАДАТЕЛИ (2):\n"
-            for i, forward in enumerate(forwards[:2], 1):
-                lineup += f"{i}. {forward['name']} (Рейтинг: {forward.get('ai_rating', 0):.1f})\n"
-        
-        elif formation == '1-2-3':
-            lineup += "🥅 ВРАТАР:\n"
+            parts.append("🥅 ВРАТАР:\n")
             if goalkeepers:
                 gk = goalkeepers[0]
-                lineup += f"• {gk['name']} (Рейтинг: {gk.get('ai_rating', 0):.1f})\n\n"
-            
-            lineup += "🛡️ ЗАЩИТНИЦИ (2):\n"
-            for i, defender in enumerate(defenders[:2], 1):
-                lineup += f"{i}. {defender['name']} (Рейтинг: {defender.get('ai_rating', 0):.1f})\n"
-            
-            lineup += "\n⚡ НАПАДАТЕЛИ (3):\n"
-            for i, forward in enumerate(forwards[:3], 1):
-                lineup += f"{i}. {forward['name']} (Рейтинг: {forward.get('ai_rating', 0):.1f})\n"
+                parts.append(f"• {gk['name']} (Рейтинг: {gk['rating_str']})\n\n")
+            
+            parts.append(f"🛡️ ЗАЩИТНИЦИ ({n_def}):\n")
+            for i, defender in enumerate(defenders[:n_def], 1):
+                parts.append(f"{i}. {defender['name']} (Рейтинг: {defender['rating_str']})\n")
+            
+            parts.append(f"\n⚡ НАПАДАТЕЛИ ({n_fwd}):\n")
+            if n_fwd == 1:
+                # Единственият нападател се показва с точка, без номер
+                if forwards:
+                    fw = forwards[0]
+                    parts.append(f"• {fw['name']} (Рейтинг: {fw['rating_str']})\n")
+            else:
+                for i, forward in enumerate(forwards[:n_fwd], 1):
+                    parts.append(f"{i}. {forward['name']} (Рейтинг: {forward['rating_str']})\n")
         
-        return lineup
+        return "".join(parts)
     
     def _generate_formation_tips(self, formation: str, specialization: str) -> List[str]:
         """Генерира съвети за формация и специализация"""
-        tips = []
-        
-        # Съвети за формацията
-        formation_tips = {
-            '1-4-1': [
-                "🛡️ Силна защита - използвайте за контраатаки",
-                "⏱️ Играйте търпеливо и чакайте момента",
-                "🎯 Фокусирайте се върху един нападател"
-            ],
-            '1-3-2': [
-                "⚖️ Балансирана формация за всички ситуации",
-                "🔄 Добра за ротация и адаптиране",
-                "💪 Стабилна основа за развитие"
-            ],
-            '1-2-3': [
-                "⚡ Агресивна атакуваща формация",
-                "🎯 Максимален натиск в атака",
-                "⚠️ Внимавайте с защитата при контраатаки"
-            ]
-        }
-        
-        tips.extend(formation_tips.get(formation, []))
-        
-        # Съвети за специализацията
-        spec_data = TACTICAL_SPECIALIZATIONS.get(specialization)
-        if spec_data:
-            tips.append(f"🎯 {spec_data.description}")
-            
-            # Специфични съвети според специализацията
-            if specialization == 'counter_attacks':
-                tips.extend([
-                    "🛡️ Играйте компактно в защита",
-                    "⚡ Бъдете готови за бързи контраатаки",
-                    "🎯 Използвайте скоростта на нападателите"
-                ])
-            elif specialization == 'forechecking':
-                tips.extend([
-                    "💪 Агресивно натискане в чуждата зона",
-                    "🏃 Високо темпо на играта",
-                    "⚠️ Внимавайте с енергията на играчите"
-                ])
-            elif specialization == 'short_passes':
-                tips.extend([
-                    "🎯 Прецизни кратки подавания",
-                    "🧠 Търпение при изграждане на атаките",
-                    "📍 Добра позиционна игра"
-                ])
-        
-        return tips
+        return [*_FORMATION_TIPS.get(formation, ()), *_SPEC_TIP_BLOCKS.get(specialization, ())]
     
     def _generate_rotation_plan(self) -> str:
         """Генерира план за ротация"""
-        plan = "🔄 ПЛАН ЗА РОТАЦИЯ:\n\n"
-        
-        plan += "⚡ ОСНОВНИ ПРИНЦИПИ:\n"
-        plan += "• Ротирайте играчите при енергия под 70%\n"
-        plan += "• Давайте почивка на ключовите играчи в по-леки мачове\n"
-        plan += "• Използвайте младите играчи за натрупване на опит\n"
-        plan += "• Следете формата - играчи в лоша форма почиват\n\n"
-        
-        plan += "📅 СЕДМИЧЕН ГРАФИК:\n"
-        plan += "• Понеделник: Анализ на изминалия мач\n"
-        plan += "• Вторник-Сряда: Основни тренировки\n"
-        plan += "• Четвъртък: Тактическа подготовка\n"
-        plan += "• Петък: Лека тренировка + почивка\n"
-        plan += "• Събота: Подготовка за мач\n"
-        plan += "• Неделя: Мач или почивка\n\n"
-        
-        plan += "⚠️ ВАЖНИ БЕЛЕЖКИ:\n"
-        plan += "• Вратарите се уморяват според броя стрелби\n"
-        plan += "• Младите играчи се развиват по-бързо\n"
-        plan += "• Следете баланса между почивка и игрово време\n"
-        
-        return plan
+        return _ROTATION_PLAN
+    
+    @staticmethod
+    def _format_opponent_block(opponent_name: str, opponent_data: Dict) -> str:
+        """Форматира блока за противник в пълния отчет"""
+        return (f"📊 {opponent_name}:\n"
+                f"• Сила: {opponent_data.get('strength_rating', 0):.1f}/100\n"
+                f"• Вероятност за победа: {opponent_data.get('win_probability', 50):.1f}%\n"
+                f"• Силни страни: {', '.join(opponent_data.get('strengths', []))}\n"
+                f"• Слабости: {', '.join(opponent_data.get('weaknesses', []))}\n\n")
+    
+    def _opponent_report_block(self, opponent_name: str, opponent_data: Dict) -> str:
+        """Връща готовия блок за противник (форматира наново само ако анализът е сменен)"""
+        cached = self._opponent_blocks.get(opponent_name)
+        if cached is not None and cached[0] is opponent_data:
+            return cached[1]
+        
+        block = self._format_opponent_block(opponent_name, opponent_data)
+        self._opponent_blocks[opponent_name] = (opponent_data, block)
+        return block
     
     def generate_comprehensive_report(self) -> str:
         """Генерира пълен отчет"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Един момент за името на файла и за реда "Генериран"
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"hockey_arena_comprehensive_report_{timestamp}.txt"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("🏒 HOCKEY ARENA MASTER AI - ПЪЛЕН ОТЧЕТ\n")
-                f.write("=" * 70 + "\n")
-                f.write(f"Генериран: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n")
-                f.write(f"Потребител: {self.username}\n\n")
-                
-                # Информация за отбора
-                f.write(self.get_team_info_summary())
-                f.write("\n\n")
+            parts = [_REPORT_HEADER.format_map({
+                'generated': now.strftime('%d.%m.%Y %H:%M:%S'),
+                'user': self.username
+            })]
+            
+            # Информация за отбора
+            parts.append(self.get_team_info_summary())
+            parts.append("\n\n")
+            
+            # Детайлни статистики
+            parts.append(self.get_detailed_team_stats())
+            parts.append("\n\n")
+            
+            # Препоръки
+            parts.append(self.get_team_recommendations())
+            parts.append("\n\n")
+            
+            # Анализ на противници
+            if self.opponents_data:
+                parts.append("🎯 АНАЛИЗ НА ПРОТИВНИЦИ\n")
+                parts.append("=" * 40 + "\n\n")
                 
-                # Детайлни статистики
-                f.write(self.get_detailed_team_stats())
-                f.write("\n\n")
+                for opponent_name, opponent_data in self.opponents_data.items():
+                    parts.append(self._opponent_report_block(opponent_name, opponent_data))
+            
+            # Тактически препоръки - секцията се пропуска изцяло, ако няма общи тактики
+            general = self.tactical_recommendations.get('general')
+            if general:
+                parts.append("⚡ ТАКТИЧЕСКИ ПРЕПОРЪКИ\n")
+                parts.append("=" * 40 + "\n\n")
                 
-                # Препоръки
-                f.write(self.get_team_recommendations())
-                f.write("\n\n")
-                
-                # Анализ на противници
-                if self.opponents_data:
-                    f.write("🎯 АНАЛИЗ НА ПРОТИВНИЦИ\n")
-                    f.write("=" * 40 + "\n\n")
-                    
-                    for opponent_name, opponent_data in self.opponents_data.items():
-                        f.write(f"📊 {opponent_name}:\n")
-                        f.write(f"• Сила: {opponent_data.get('strength_rating', 0):.1f}/100\n")
-                        f.write(f"• Вероятност за победа: {opponent_data.get('win_probability', 50):.1f}%\n")
-                        f.write(f"• Силни страни: {', '.join(opponent_data.get('strengths', []))}\n")
-                        f.write(f"• Слабости: {', '.join(opponent_data.get('weaknesses', []))}\n\n")
-                
-                # Тактически препоръки
-                if self.tactical_recommendations:
-                    f.write("⚡ ТАКТИЧЕСКИ ПРЕПОРЪКИ\n")
-                    f.write("=" * 40 + "\n\n")
-                    
-                    general = self.tactical_recommendations.get('general', {})
-                    f.write(f"🎯 Общ стил: {general.get('style', 'Unknown')}\n")
-                    f.write(f"🏒 Препоръчителна формация: {general.get('formation', 'Unknown')}\n")
-                    f.write(f"⚡ Специализация: {general.get('specialization', 'Unknown')}\n\n")
-                
-                # Системна информация
-                f.write("🔧 СИСТЕМНА ИНФОРМАЦИЯ\n")
-                f.write("=" * 40 + "\n")
-                f.write(f"• Анализирани играчи: {len(self.our_players)}\n")
-                f.write(f"• Анализирани противници: {len(self.opponents_data)}\n")
-                f.write(f"• Генерирани тактически планове: {len(self.tactical_recommendations)}\n")
-                f.write(f"• Версия на AI: Hockey Arena Master AI v4.0\n")
+                parts.append(f"🎯 Общ стил: {general.get('style', 'Unknown')}\n"
+                             f"🏒 Препоръчителна формация: {general.get('formation', 'Unknown')}\n"
+                             f"⚡ Специализация: {general.get('specialization', 'Unknown')}\n\n")
+            
+            # Системна информация
+            parts.append(_REPORT_FOOTER.format_map({
+                'n_players': len(self.our_players),
+                'n_opponents': len(self.opponents_data),
+                'n_plans': len(self.tactical_recommendations)
+            }))
+            
+            # Записваме през временен файл, за да не остане наполовина записан отчет
+            _write_text_atomic(filename, "".join(parts))
             
             logger.info(f"✅ Comprehensive report generated: {filename}")
             return filename
@@ -3035,6 +3932,13 @@ def main():
         print("📝 Please install required packages:")
         print("   pip install tkinter matplotlib seaborn")
         
+        # Без GUI библиотеки - направо конзолен режим
+        print("\n📝 Attempting console fallback...")
+        try:
+            run_console_fallback()
+        except Exception as fallback_error:
+            print(f"❌ Console fallback also failed: {fallback_error}")
+    
     except Exception as e:
         print(f"💥 Unexpected error: {str(e)}")
         logger.error(f"Main execution error: {str(e)}")
@@ -3048,9 +3952,13 @@ def main():
 
 def run_console_fallback():
     """Конзолен fallback режим"""
-    print("\n" + "="*50)
-    print("📝 CONSOLE MODE (Fallback)")
-    print("="*50)
+    # Банерът и резултатите се извеждат с по един запис в stdout
+    sys.stdout.write("\n".join([
+        "",
+        "=" * 50,
+        "📝 CONSOLE MODE (Fallback)",
+        "=" * 50
+    ]) + "\n")
     
     username = input("Username: ").strip()
     password = input("Password: ").strip()
@@ -3080,13 +3988,15 @@ def run_console_fallback():
         ai.generate_optimal_tactics()
         
         # Показване на резултати
-        print("\n" + "="*50)
-        print("📊 ANALYSIS RESULTS")
-        print("="*50)
-        
-        print(f"Team Rating: {ai.get_team_rating():.1f}/100")
-        print(f"Players Analyzed: {len(ai.our_players)}")
-        print(f"Opponents Analyzed: {len(ai.opponents_data)}")
+        sys.stdout.write("\n".join([
+            "",
+            "=" * 50,
+            "📊 ANALYSIS RESULTS",
+            "=" * 50,
+            f"Team Rating: {ai.get_team_rating():.1f}/100",
+            f"Players Analyzed: {len(ai.our_players)}",
+            f"Opponents Analyzed: {len(ai.opponents_data)}"
+        ]) + "\n")
         
         # Генериране на отчет
         report_file = ai.generate_comprehensive_report()